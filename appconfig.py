@@ -10,6 +10,49 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     CACHE_SERVER_URL: str        
     CACHE_TTL: str = "30m"      
+    CACHE_STALE_TTL: str = "6h"  # por quanto tempo após o CACHE_TTL uma entrada ainda pode ser servida
+    CACHE_EMPTY_TTL: str = "5m"  # páginas sem resultados e 404
+    CACHE_ERROR_TTL: str = "1h"  # demais erros 4xx levantados pelo endpoint (5xx nunca são armazenados)
+    # Políticas por endpoint (nome da função), sobrepondo os padrões acima.
+    # Ex.: {"consulta_proposta": {"ttl": "1h", "empty_ttl": "1m", "error_ttl": "10m", "stale_ttl": "12h"}}
+    CACHE_POLICIES: dict = {}
+    CACHE_LOCK_TTL: int = 60  # segundos; evita travar a chave se o worker cair durante o cálculo
+    CACHE_COMPRESSION: str = "zstd"  # zstd | zlib | none
+    CACHE_COMPRESSION_LEVEL: int = 3
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024  # valores menores são gravados sem compressão
+    CACHE_MAX_ENTRY_BYTES: int = 8 * 1024 * 1024  # entradas maiores (já comprimidas) não são armazenadas
+    CACHE_ADMISSION_BYTES: int = 256 * 1024  # acima disso a entrada só é armazenada na segunda requisição
+    CACHE_MEMORY_BUDGET: int = 1024 * 1024 * 1024  # limite da aplicação no Redis compartilhado
+    CACHE_PREFETCH_CONCURRENCY: int = 2  # antecipações simultâneas da próxima página (0 desativa)
+    CACHE_PREFETCH_TRACKED: int = 10000  # consultas paginadas acompanhadas por worker
+    CACHE_SNAPSHOT_ENABLED: bool = False  # grava as entradas mais acessadas no desligamento
+    CACHE_SNAPSHOT_FILE: str = "snapshots/cache.snapshot"
+    CACHE_SNAPSHOT_KEYS: int = 2000
+    BLOOM_KEY_COLUMNS: list = ["id_proposta", "nr_convenio", "id_proponente", "id_programa"]
+    BLOOM_FPR: float = 0.01  # taxa de falsos positivos dos filtros de existência
+    BLOOM_VERIFY_INTERVAL: float = 1.0  # segundos em que uma conferência da versão da tabela vale para os "ausentes"
+    STATS_FLUSH_INTERVAL: float = 0.5  # segundos entre envios das estatísticas ao Redis
+    STATS_DIR: str = "stats"  # série temporal de requisições (minuto/hora/dia)
+    STATS_MINUTE_RETENTION_HOURS: int = 48  # depois disso os minutos viram agregados por hora
+    STATS_HOUR_RETENTION_DAYS: int = 90  # depois disso as horas viram agregados por dia
+    SLOW_QUERY_MS: int = 500  # consultas mais lentas vão para logs/slow_queries.log
+    SLOW_QUERY_EXPLAIN_RATE: float = 0.1  # fração das consultas lentas com EXPLAIN (ANALYZE, BUFFERS)
+    QUERY_SHAPES_TRACKED: int = 500  # formatos de consulta acompanhados por worker
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # segundos aguardando uma conexão livre antes de erro
+    DB_POOL_RECYCLE: int = 3600  # recicla as conexões após 1 hora
+    DB_POOL_PRE_PING: bool = True
+    POOL_WAIT_WARN_MS: int = 100  # espera por conexão acima disso gera aviso no log
+    LOOP_LAG_INTERVAL: float = 0.5  # segundos entre medições do atraso do event loop
+    LOOP_LAG_WARN_MS: int = 100
+    HEALTH_WARN_INTERVAL: int = 60  # intervalo mínimo entre avisos repetidos de pool/event loop
+    PROFILER_INTERVAL_MS: float = 5  # intervalo de amostragem do /stats/profile
+    PROFILER_MAX_SECONDS: int = 60
+    HTTP_CACHE_MAX_AGE: int = 300  # Cache-Control enviado ao CDN/Traefik nas respostas em cache
+    # Identificador do deploy (ex.: commit). Entra no ETag e no Last-Modified junto com o
+    # esquema OpenAPI, para que mudanças no formato das respostas invalidem os 304
+    API_BUILD: str = ""
     APP_NAME: str
     APP_DESCRIPTION: str
     APP_TAGS: list = [
@@ -69,7 +112,24 @@ class Settings(BaseSettings):
     ]
     DEFAULT_PAGE_SIZE: int = 100
     MAX_PAGE_SIZE: int = 1000
+    MAX_IDS_PER_LOOKUP: int = 100  # ids repetidos aceitos em uma consulta por chave primária
     ERROR_MESSAGE_NO_PARAMS: str = "Nenhum parâmetro de consulta foi informado."
     ERROR_MESSAGE_INTERNAL: str = "Erro Interno Inesperado."
+    ERROR_MESSAGE_NOT_FOUND: str = "Nenhum registro encontrado para os parâmetros informados."
+    ERROR_MESSAGE_RAIO: str = "Consulta por raio exige latitude_centro, longitude_centro e raio_km."
+    DATASET_CHECK_INTERVAL: int = 300  # segundos entre verificações de recarga da base
+    WARMUP_ENABLED: bool = True
+    WARMUP_LOG_FILE: str = "logs/api_access.log"
+    WARMUP_LOG_BYTES: int = 16 * 1024 * 1024  # lê apenas o final do log
+    WARMUP_TOP_N: int = 20  # consultas mais frequentes por endpoint
+    WARMUP_CONCURRENCY: int = 4
+    WARMUP_TIMEOUT: int = 120  # segundos; a aplicação fica pronta mesmo se o warm-up não terminar
+    SPATIAL_GRID_CELL_DEG: float = 0.25
+    MAX_RAIO_KM: float = 500
+    TILE_MAX_ZOOM: int = 20
+    TILE_PRECOMPUTE_MAX_ZOOM: int = 6  # tiles até este zoom são calculados a cada recarga
+    TILE_POINTS_MIN_ZOOM: int = 14  # a partir deste zoom os tiles trazem os pontos individuais
+    TILE_CLUSTER_GRID: int = 8  # células de agregação por eixo em cada tile
+    ERROR_MESSAGE_TILE: str = "Tile inexistente para o nível de zoom informado."
     STATS_USER: str 
     STATS_PASSWORD: str 
\ No newline at end of file
@@ -0,0 +1,76 @@
+# Mede o custo por requisição da instrumentação de estatísticas: app sem middleware,
+# o antigo @app.middleware("http") (BaseHTTPMiddleware) e o RequestStatsMiddleware em ASGI puro.
+# Uso: python -m benchmarks.bench_middleware [requisições]
+import asyncio
+import datetime as dt
+import sys
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from src.instrumentation import RequestStatsMiddleware
+from src.stats import stats_recorder
+
+EXCLUDED = ["/", "/stats", "/stats/queries", "/stats/series", "/metrics", "/docs",
+            "/static/icon.jpg", "/openapi.json", "/favicon.ico"]
+
+
+def build_app(kind: str) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @app.get("/proposta")
+    async def proposta():
+        return {"data": [{"id_proposta": 1, "uf_proponente": "SP"}], "total_items": 1}
+
+    if kind == "base_http":
+        # Reprodução do track_requests anterior
+        @app.middleware("http")
+        async def track_requests(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            path = request.url.path
+            if path in EXCLUDED or "X-Cache-Warmup" in request.headers:
+                return response
+            _curr_date = dt.datetime.now(tz=dt.timezone(dt.timedelta(hours=-3)))
+            stats_recorder.record(path, process_time, _curr_date.strftime("%m/%Y"))
+            return response
+    elif kind == "asgi":
+        app.add_middleware(RequestStatsMiddleware, excluded_paths=EXCLUDED)
+    return app
+
+
+async def run(app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/proposta", "raw_path": b"/proposta", "root_path": "",
+        "query_string": b"uf_proponente=SP", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Aquecimento (montagem da pilha de middlewares, caches do roteador)
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / n * 1_000_000
+
+
+def main(n: int):
+    results = {}
+    for kind in ("none", "base_http", "asgi"):
+        results[kind] = asyncio.run(run(build_app(kind), n))
+    baseline = results["none"]
+    print(f"requisições: {n}")
+    for kind, label in (("none", "sem middleware"), ("base_http", "@app.middleware"), ("asgi", "ASGI puro")):
+        print(f"{label:<16} {results[kind]:8.1f} µs/req  overhead: {results[kind] - baseline:7.1f} µs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
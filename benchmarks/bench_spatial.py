@@ -0,0 +1,55 @@
+# Compara o índice em grade de coordenadas_obra com a varredura completa dos pontos.
+# Uso: python -m benchmarks.bench_spatial [quantidade_de_pontos]
+import random
+import sys
+import time
+from src.spatial import GridIndex, haversine_km
+
+
+def full_scan_bbox(points, min_lat, min_lon, max_lat, max_lon):
+    return [id_ for id_, lat, lon in points
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon]
+
+
+def full_scan_radius(points, lat, lon, km):
+    return [id_ for id_, p_lat, p_lon in points if haversine_km(lat, lon, p_lat, p_lon) <= km]
+
+
+def timed(func, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main(n: int):
+    rnd = random.Random(42)
+    # Pontos distribuídos no retângulo que envolve o território brasileiro
+    points = [(i, rnd.uniform(-33.7, 5.2), rnd.uniform(-73.9, -34.8)) for i in range(1, n + 1)]
+
+    start = time.perf_counter()
+    grid = GridIndex()
+    grid.build(points)
+    print(f"pontos: {n}  construção do índice: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    cases = [
+        ("bbox município (~0.2°)", "bbox", (-15.9, -48.0, -15.7, -47.8)),
+        ("bbox estado (~5°)", "bbox", (-20.0, -51.0, -15.0, -46.0)),
+        ("bbox país", "bbox", (-33.7, -73.9, 5.2, -34.8)),
+        ("raio 10 km", "radius", (-15.79, -47.88, 10)),
+        ("raio 200 km", "radius", (-15.79, -47.88, 200)),
+    ]
+    for label, kind, args in cases:
+        if kind == "bbox":
+            t_grid, r_grid = timed(grid.bbox, *args)
+            t_scan, r_scan = timed(full_scan_bbox, points, *args, repeat=3)
+        else:
+            t_grid, r_grid = timed(grid.radius, *args)
+            t_scan, r_scan = timed(full_scan_radius, points, *args, repeat=3)
+        assert sorted(r_grid) == r_scan, label
+        print(f"{label:<24} resultados: {len(r_grid):>7}  grade: {t_grid:9.3f} ms  "
+              f"varredura: {t_scan:9.3f} ms  ganho: {t_scan / t_grid:6.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -1,24 +1,34 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status, Depends, WebSocket
+from fastapi import FastAPI, status, Depends, WebSocket, Query, HTTPException
+from typing import Literal, Optional
 from fastapi.websockets import WebSocketDisconnect
 import orjson
-from fastapi.responses import RedirectResponse, ORJSONResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse, HTMLResponse, PlainTextResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.staticfiles import StaticFiles
 import logging
-from cashews.contrib.fastapi import (
-    CacheEtagMiddleware,
-    CacheRequestControlMiddleware    
-)
-from collections import defaultdict
+from cashews.contrib.fastapi import CacheRequestControlMiddleware
+from cashews.ttl import ttl_to_seconds
 from src.database import Database
-from src.cache import setup_cache
-from src.utils import reset_minute_counters, verify_admin, config, save_stats
+from src.cache import setup_cache, cache_stats, cache_budget, CacheStatusMiddleware, DatasetEtagMiddleware
+from src.dataset import dataset
+from src.spatial import coordenadas_index
+from src.warmup import warm_up, warmup_stats
+from src.snapshot import save_snapshot, restore_snapshot
+from src.bloom import existence_index
+from src.stats import stats_recorder
+from src.timeseries import TimeSeriesStore
+from src.metrics import render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.dbstats import query_stats
+from src.broadcast import StatsBroadcaster
+from src.instrumentation import RequestStatsMiddleware
+from src.health import loop_monitor, pool_stats
+from src.profiler import ProfileRequestMiddleware, profile_for, profile_lock
+from src.utils import verify_admin, config
 import asyncio
+import os
 import psutil
-import json
 import time
-import datetime as dt
 
 
 # Importando Rotas
@@ -34,6 +44,7 @@ from src.routers.proposta_formalizacao_pac import prpfpac_router
 from src.routers.plano_aplicacao_detalhado import plapdet_router
 from src.routers.meta_crono_fisico import meta_crono_fisico_router
 from src.routers.etapa_crono_fisico import etapa_crono_fisico_router
+from src.routers.cronograma_fisico import cronograma_fisico_router
 from src.routers.convenio import convenio_router
 from src.routers.historico_situacao import historico_situacao_router
 from src.routers.termo_aditivo import termo_aditivo_router
@@ -74,40 +85,64 @@ logger = logging.getLogger(__name__)
 
 # Initialize instances
 db = Database()
-# Initialize a dictionary to store request counts and timings
-request_stats = defaultdict(lambda: {"count": 0, "total_time": 0, "last_minute_count": 0, "up_time": 0})
-monthly_stats = defaultdict(int)
-excluded_stats_paths = ["/", "/stats", "/docs", "/static/icon.jpg", "/openapi.json", "/favicon.ico"]
+# Request counts and timings, aggregated across workers by stats_recorder
+request_stats = stats_recorder.request_stats
+monthly_stats = stats_recorder.monthly_stats
+app_uptime = None
+timeseries = TimeSeriesStore(config.STATS_DIR, config.STATS_MINUTE_RETENTION_HOURS, config.STATS_HOUR_RETENTION_DAYS)
+excluded_stats_paths = ["/", "/stats", "/stats/queries", "/stats/series", "/stats/profile", "/metrics", "/docs", "/static/icon.jpg", "/openapi.json", "/favicon.ico"]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global app_uptime
     # load before the app starts
     logger.info("Iniciando aplicação...")
     try:
         # Inicializa o Banco de Dados
         await db.init_db()        
+        query_stats.instrument(db.engine)
+        pool_stats.instrument(db.engine)
         # Configure o cache
         setup_cache(config)
-        # background task to reset the "last minute" counters every 60 seconds.
-        reset_task = asyncio.create_task(reset_minute_counters(request_stats))
-        save_task = asyncio.create_task(save_stats(monthly_stats))
+        stats_recorder.setup(config.CACHE_SERVER_URL, timeseries)
+        # Totais persistidos sobrevivem a reinícios (e a um Redis sem persistência)
+        await asyncio.to_thread(timeseries.load)
+        await stats_recorder.seed(*timeseries.totals())
+        # Índices derivados da base são reconstruídos a cada recarga dos dumps
+        dataset.on_change(["coordenadas_obra"], coordenadas_index.rebuild)
+        existence_index.register(dataset)
+        await dataset.refresh(db.engine)
+        if config.CACHE_SNAPSHOT_ENABLED:
+            await restore_snapshot(config.CACHE_SNAPSHOT_FILE)
+        # Aquece o cache antes de aceitar tráfego e novamente a cada recarga (a versão da chave muda)
+        await warm_up(app)
+        dataset.on_change(None, lambda engine: warm_up(app))
+        dataset_task = asyncio.create_task(dataset.watch(db.engine, config.DATASET_CHECK_INTERVAL))
+        # background task flushing request stats to the shared store
+        stats_task = asyncio.create_task(stats_recorder.run(config.STATS_FLUSH_INTERVAL))
+        loop_task = asyncio.create_task(loop_monitor.run(config.LOOP_LAG_INTERVAL))
         # setting app uptime with timezone offset
         _app_uptime = time.time() - 3*3600
-        request_stats["/"]["up_time"] = time.strftime("%d/%m/%Y %H:%M", time.localtime(_app_uptime))
+        app_uptime = time.strftime("%d/%m/%Y %H:%M", time.localtime(_app_uptime))
         logger.info("Aplicação iniciada com sucesso!")
     except Exception as e:
         logger.error(f"Erro na inicialização: {str(e)}")
         raise
     yield
     # load after the app has finished
-    # Shutdown: Cancel the background task
-    reset_task.cancel()
-    save_task.cancel()
-    try:
-        await reset_task
-        await save_task
-    except asyncio.CancelledError:
-        pass
+    if config.CACHE_SNAPSHOT_ENABLED:
+        try:
+            await save_snapshot(config.CACHE_SNAPSHOT_FILE)
+        except Exception as e:
+            logger.error(f"Erro ao gravar snapshot do cache: {e!r}")
+    await stats_broadcaster.stop()
+    # Shutdown: Cancel the background tasks
+    for task in (stats_task, dataset_task, loop_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
     
 
 app = FastAPI(lifespan=lifespan, 
@@ -119,29 +154,13 @@ app = FastAPI(lifespan=lifespan,
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Incluindo Middlewares
-app.add_middleware(CacheEtagMiddleware)
 app.add_middleware(CacheRequestControlMiddleware)
-
-
-@app.middleware("http")
-async def track_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    
-    # Update stats
-    path = request.url.path
-    if path in excluded_stats_paths:
-        return response
-    
-    _curr_date = dt.datetime.now(tz=dt.timezone(dt.timedelta(hours=-3)))
-    _curr_month = _curr_date.strftime("%m/%Y")
-    monthly_stats[_curr_month] += 1
-    request_stats[path]["count"] += 1
-    request_stats[path]["total_time"] += process_time
-    request_stats[path]["last_minute_count"] += 1
-    
-    return response
+app.add_middleware(CacheStatusMiddleware)
+app.add_middleware(DatasetEtagMiddleware, max_age=config.HTTP_CACHE_MAX_AGE)
+# Mais externo: também contabiliza os 304 respondidos pelo DatasetEtagMiddleware
+app.add_middleware(RequestStatsMiddleware, excluded_paths=excluded_stats_paths)
+# X-Profile + credenciais de admin: devolve o perfil do worker durante a requisição no lugar da resposta
+app.add_middleware(ProfileRequestMiddleware)
 
 
 # Incluindo Rotas
@@ -157,6 +176,7 @@ app.include_router(prpfpac_router)
 app.include_router(plapdet_router)
 app.include_router(meta_crono_fisico_router)
 app.include_router(etapa_crono_fisico_router)
+app.include_router(cronograma_fisico_router)
 app.include_router(convenio_router)
 app.include_router(historico_situacao_router)
 app.include_router(termo_aditivo_router)
@@ -206,12 +226,53 @@ async def docs_redirect():
     return RedirectResponse(url='/docs')
 
 
+def _hit_ratio(stats: dict) -> float:
+    # Respostas servidas com cópia antiga também evitam ida ao banco
+    served = stats["hits"] + stats["stale"]
+    total = served + stats["misses"]
+    return served / total * 100 if total > 0 else 0
+
+
+def _prefetch_hit_ratio(stats: dict) -> float:
+    return stats["prefetch_hits"] / stats["prefetches"] * 100 if stats["prefetches"] > 0 else 0
+
+
+def _compression_ratio(stats: dict) -> float:
+    return stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] > 0 else 0
+
+
+def _health_rows(pool: dict, loop: dict) -> dict:
+    """Linhas da tabela de pool/event loop do /stats (o JS da página repete a formatação)."""
+    rows = {}
+    if pool:
+        rows.update({
+            "pool-usage": ("Pool: in use / idle / overflow",
+                           f"{pool['checked_out']} / {pool['idle']} / {pool['overflow']} "
+                           f"(size {pool['size']} + {pool['max_overflow']})"),
+            "pool-peak": ("Pool: peak in use", f"{pool['peak_checked_out']}"),
+            "pool-wait": ("Checkout wait 1m p50 / p99 / max (ms)",
+                          f"{pool['wait']['p50']:.1f} / {pool['wait']['p99']:.1f} / {pool['wait']['max']:.1f}"),
+            "pool-ping": ("Pre-ping 1m p50 / p99 (ms)", f"{pool['pre_ping']['p50']:.1f} / {pool['pre_ping']['p99']:.1f}"),
+            "pool-errors": ("Timeouts / invalidated connections", f"{pool['timeouts']} / {pool['invalidations']}"),
+        })
+    rows["loop-lag"] = ("Event loop lag last / 1m p99 / max (ms)",
+                        f"{loop['last_ms']:.1f} / {loop['p99']:.1f} / {loop['max']:.1f}")
+    return rows
+
+
+def _bloom_stats() -> dict:
+    return {
+        f"{table}.{column}": {**stats, "observed_fpr": existence_index.observed_fpr(stats)}
+        for (table, column), stats in sorted(existence_index.stats.items())
+    }
+
+
 @app.get("/stats", include_in_schema=False, response_class=HTMLResponse)
 async def get_stats(username: str = Depends(verify_admin)):
+    latency = await stats_recorder.latency()
     cpu_percent = psutil.cpu_percent()
     memory_percent = psutil.virtual_memory().percent
     disk_percent = psutil.disk_usage('/').percent
-    app_uptime = request_stats["/"]["up_time"]
     html_content = f"""
         <html>
             <head>
@@ -269,6 +330,17 @@ async def get_stats(username: str = Depends(verify_admin)):
                     <h5 class="chart-title">Requisições Mensais</h5>
                     <canvas id="monthlyRequestsChart" width="100px" height="40px"></canvas>
                 </div>
+                <div class="chart-container">
+                    <h5 class="chart-title">Histórico de Requisições</h5>
+                    <select id="historyWindow">
+                        <option value="1h">1 hora</option>
+                        <option value="24h" selected>24 horas</option>
+                        <option value="7d">7 dias</option>
+                        <option value="30d">30 dias</option>
+                        <option value="365d">1 ano</option>
+                    </select>
+                    <canvas id="historyChart" width="100px" height="40px"></canvas>
+                </div>
                 <h2>Endpoint Stats</h2>
                 <h3>Since: {app_uptime}</h3>
                 <table id="endpointStats">
@@ -296,6 +368,176 @@ async def get_stats(username: str = Depends(verify_admin)):
                 </tr>
         """
 
+    html_content += """
+                </tbody>
+            </table>
+            <h2>Cache</h2>
+            <table id="cacheStats">
+                <thead>
+                    <tr>
+                        <th>Endpoint</th>
+                        <th>Hits</th>
+                        <th>Misses</th>
+                        <th>Stale</th>
+                        <th>Refresh Errors</th>
+                        <th>Hit Ratio (%)</th>
+                        <th>Not Cached</th>
+                        <th>Compression Ratio</th>
+                        <th>Saved (KB)</th>
+                        <th>Prefetched</th>
+                        <th>Prefetch Hit (%)</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+
+    for endpoint, stats in cache_stats.items():
+        html_content += f"""
+                <tr data-endpoint="{endpoint}">
+                    <td>{endpoint}</td>
+                    <td>{stats['hits']}</td>
+                    <td>{stats['misses']}</td>
+                    <td>{stats['stale']}</td>
+                    <td>{stats['refresh_errors']}</td>
+                    <td>{_hit_ratio(stats):.1f}</td>
+                    <td>{stats['not_cached']}</td>
+                    <td>{_compression_ratio(stats):.1f}</td>
+                    <td>{(stats['raw_bytes'] - stats['stored_bytes']) / 1024:.0f}</td>
+                    <td>{stats['prefetches']}</td>
+                    <td>{_prefetch_hit_ratio(stats):.1f}</td>
+                </tr>
+        """
+
+    html_content += f"""
+                </tbody>
+            </table>
+            <p>Memory budget: <span id="cache-budget">{cache_budget.used / 1024 ** 2:.1f} / {cache_budget.limit / 1024 ** 2:.0f}</span> MB</p>
+            <h2>Warm-up</h2>
+            <table id="warmupStats">
+                <thead>
+                    <tr>
+                        <th>Metric</th>
+                        <th>Value</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    <tr>
+                        <td>Status</td>
+                        <td id="warmup-status">{warmup_stats['status']}</td>
+                    </tr>
+                    <tr>
+                        <td>Started At</td>
+                        <td id="warmup-started">{warmup_stats['started_at'] or '-'}</td>
+                    </tr>
+                    <tr>
+                        <td>Duration (s)</td>
+                        <td id="warmup-duration">{warmup_stats['duration']:.1f}</td>
+                    </tr>
+                    <tr>
+                        <td>Queries Replayed</td>
+                        <td id="warmup-replayed">{warmup_stats['replayed']}</td>
+                    </tr>
+                    <tr>
+                        <td>Already Cached</td>
+                        <td id="warmup-cached">{warmup_stats['already_cached']}</td>
+                    </tr>
+                    <tr>
+                        <td>Errors</td>
+                        <td id="warmup-errors">{warmup_stats['errors']}</td>
+                    </tr>
+                    <tr>
+                        <td>Expected Hit Rate (%)</td>
+                        <td id="warmup-coverage">{warmup_stats['coverage']:.1f}</td>
+                    </tr>
+                </tbody>
+            </table>
+            <h2>Bloom Filters</h2>
+            <table id="bloomStats">
+                <thead>
+                    <tr>
+                        <th>Column</th>
+                        <th>Items</th>
+                        <th>Size (KB)</th>
+                        <th>Checks</th>
+                        <th>Short-circuited</th>
+                        <th>Expected FPR (%)</th>
+                        <th>Observed FPR (%)</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+
+    for column, stats in _bloom_stats().items():
+        html_content += f"""
+                <tr data-column="{column}">
+                    <td>{column}</td>
+                    <td>{stats['items']}</td>
+                    <td>{stats['size_bytes'] / 1024:.0f}</td>
+                    <td>{stats['checks']}</td>
+                    <td>{stats['negatives']}</td>
+                    <td>{stats['expected_fpr'] * 100:.2f}</td>
+                    <td>{stats['observed_fpr'] * 100:.2f}</td>
+                </tr>
+        """
+
+    html_content += """
+                </tbody>
+            </table>
+            <h2>Latency</h2>
+            <table id="latencyStats">
+                <thead>
+                    <tr>
+                        <th>Endpoint</th>
+                        <th>Window</th>
+                        <th>Requests</th>
+                        <th>p50 (ms)</th>
+                        <th>p90 (ms)</th>
+                        <th>p99 (ms)</th>
+                        <th>Max (ms)</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+
+    for window, series in latency.items():
+        for name, stats in series.items():
+            html_content += f"""
+                <tr data-series="{name}|{window}">
+                    <td>{name}</td>
+                    <td>{window}</td>
+                    <td>{stats['count']}</td>
+                    <td>{stats['p50']:.1f}</td>
+                    <td>{stats['p90']:.1f}</td>
+                    <td>{stats['p99']:.1f}</td>
+                    <td>{stats['max']:.1f}</td>
+                </tr>
+            """
+
+    html_content += """
+                </tbody>
+            </table>
+    """
+
+    html_content += """
+            <h2>Connection Pool &amp; Event Loop</h2>
+            <table id="healthStats">
+                <thead>
+                    <tr>
+                        <th>Metric</th>
+                        <th>Value</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+
+    for row_id, (label, value) in _health_rows(pool_stats.snapshot(), loop_monitor.snapshot()).items():
+        html_content += f"""
+                    <tr>
+                        <td>{label}</td>
+                        <td id="{row_id}">{value}</td>
+                    </tr>
+        """
+
     html_content += """
                 </tbody>
             </table>
@@ -406,13 +648,75 @@ async def get_stats(username: str = Depends(verify_admin)):
                     }
                 });
 
+                const historyChart = new Chart(document.getElementById('historyChart').getContext('2d'), {
+                    type: 'line',
+                    data: {
+                        labels: [],
+                        datasets: [{
+                            label: 'Requests',
+                            data: [],
+                            borderColor: 'rgba(44, 108, 192, 1)',
+                            backgroundColor: 'rgba(44, 108, 192, 0.2)',
+                            fill: true,
+                            pointRadius: 0
+                        }]
+                    },
+                    options: {
+                        responsive: true,
+                        plugins: {
+                            legend: {
+                                display: false
+                            }
+                        },
+                        scales: {
+                            y: {
+                                beginAtZero: true
+                            }
+                        }
+                    }
+                });
+
+                // Loads the selected window from the persisted time series
+                async function loadHistory() {
+                    const selected = document.getElementById('historyWindow').value;
+                    const response = await fetch(`/stats/series?window=${selected}`);
+                    const series = await response.json();
+                    const dayStep = series.step >= 86400;
+                    historyChart.data.labels = series.points.map(point => {
+                        const date = new Date(point.t * 1000);
+                        return dayStep ? date.toLocaleDateString() : date.toLocaleString();
+                    });
+                    historyChart.data.datasets[0].data = series.points.map(point => point.count);
+                    historyChart.update();
+                }
+                document.getElementById('historyWindow').addEventListener('change', loadHistory);
+                loadHistory();
+                setInterval(loadHistory, 60000);
+
                 // Initialize WebSocket connection
                 const socket = new WebSocket("ws://localhost:8000/ws");
 
+                // Full snapshot on connect, then only the fields that changed (JSON Merge Patch)
+                let state = {};
+                function mergePatch(target, patch) {
+                    for (const [key, value] of Object.entries(patch)) {
+                        if (value === null) {
+                            delete target[key];
+                        } else if (typeof value === 'object' && !Array.isArray(value)
+                                   && typeof target[key] === 'object' && target[key] !== null) {
+                            mergePatch(target[key], value);
+                        } else {
+                            target[key] = value;
+                        }
+                    }
+                    return target;
+                }
+
                 // Handle WebSocket messages
                 socket.onmessage = function(event) {
-                    const data = JSON.parse(event.data);
-                    updateStats(data);
+                    const message = JSON.parse(event.data);
+                    state = message.type === 'full' ? message.data : mergePatch(state, message.data);
+                    updateStats(state);
                 };
 
                 // Function to update the per minute chart with new data
@@ -473,6 +777,99 @@ async def get_stats(username: str = Depends(verify_admin)):
                         row.cells[3].textContent = stats.avg_time.toFixed(2); // Update Avg Response Time
                     }
 
+                    // Update cache stats table
+                    const cacheBody = document.getElementById('cacheStats').querySelector('tbody');
+                    for (const [endpoint, stats] of Object.entries(data.cache)) {
+                        let row = cacheBody.querySelector(`tr[data-endpoint="${endpoint}"]`);
+                        if (!row) {
+                            row = cacheBody.insertRow();
+                            row.setAttribute('data-endpoint', endpoint);
+                            for (let i = 0; i < 11; i++) {
+                                row.insertCell();
+                            }
+                            row.cells[0].textContent = endpoint;
+                        }
+                        row.cells[1].textContent = stats.hits;
+                        row.cells[2].textContent = stats.misses;
+                        row.cells[3].textContent = stats.stale;
+                        row.cells[4].textContent = stats.refresh_errors;
+                        row.cells[5].textContent = stats.hit_ratio.toFixed(1);
+                        row.cells[6].textContent = stats.not_cached;
+                        row.cells[7].textContent = stats.compression_ratio.toFixed(1);
+                        row.cells[8].textContent = ((stats.raw_bytes - stats.stored_bytes) / 1024).toFixed(0);
+                        row.cells[9].textContent = stats.prefetches;
+                        row.cells[10].textContent = stats.prefetch_hit_ratio.toFixed(1);
+                    }
+                    document.getElementById("cache-budget").textContent =
+                        `${(data.cache_budget.used / 1024 ** 2).toFixed(1)} / ${(data.cache_budget.limit / 1024 ** 2).toFixed(0)}`;
+
+                    // Update warm-up stats
+                    document.getElementById("warmup-status").textContent = data.warmup.status;
+                    document.getElementById("warmup-started").textContent = data.warmup.started_at || "-";
+                    document.getElementById("warmup-duration").textContent = data.warmup.duration.toFixed(1);
+                    document.getElementById("warmup-replayed").textContent = data.warmup.replayed;
+                    document.getElementById("warmup-cached").textContent = data.warmup.already_cached;
+                    document.getElementById("warmup-errors").textContent = data.warmup.errors;
+                    document.getElementById("warmup-coverage").textContent = data.warmup.coverage.toFixed(1);
+
+                    // Update bloom filter stats
+                    const bloomBody = document.getElementById('bloomStats').querySelector('tbody');
+                    for (const [column, stats] of Object.entries(data.bloom)) {
+                        let row = bloomBody.querySelector(`tr[data-column="${column}"]`);
+                        if (!row) {
+                            row = bloomBody.insertRow();
+                            row.setAttribute('data-column', column);
+                            for (let i = 0; i < 7; i++) {
+                                row.insertCell();
+                            }
+                            row.cells[0].textContent = column;
+                        }
+                        row.cells[1].textContent = stats.items;
+                        row.cells[2].textContent = (stats.size_bytes / 1024).toFixed(0);
+                        row.cells[3].textContent = stats.checks;
+                        row.cells[4].textContent = stats.negatives;
+                        row.cells[5].textContent = (stats.expected_fpr * 100).toFixed(2);
+                        row.cells[6].textContent = (stats.observed_fpr * 100).toFixed(2);
+                    }
+
+                    // Update latency percentiles
+                    const latencyBody = document.getElementById('latencyStats').querySelector('tbody');
+                    for (const [window, series] of Object.entries(data.latency)) {
+                        for (const [name, stats] of Object.entries(series)) {
+                            const key = `${name}|${window}`;
+                            let row = latencyBody.querySelector(`tr[data-series="${key}"]`);
+                            if (!row) {
+                                row = latencyBody.insertRow();
+                                row.setAttribute('data-series', key);
+                                for (let i = 0; i < 7; i++) {
+                                    row.insertCell();
+                                }
+                                row.cells[0].textContent = name;
+                                row.cells[1].textContent = window;
+                            }
+                            row.cells[2].textContent = stats.count;
+                            row.cells[3].textContent = stats.p50.toFixed(1);
+                            row.cells[4].textContent = stats.p90.toFixed(1);
+                            row.cells[5].textContent = stats.p99.toFixed(1);
+                            row.cells[6].textContent = stats.max.toFixed(1);
+                        }
+                    }
+
+                    // Update pool and event loop health
+                    const setHealth = (id, text) => {
+                        const cell = document.getElementById(id);
+                        if (cell) cell.textContent = text;
+                    };
+                    const pool = data.pool;
+                    if (pool && pool.size !== undefined) {
+                        setHealth('pool-usage', `${pool.checked_out} / ${pool.idle} / ${pool.overflow} (size ${pool.size} + ${pool.max_overflow})`);
+                        setHealth('pool-peak', `${pool.peak_checked_out}`);
+                        setHealth('pool-wait', `${pool.wait.p50.toFixed(1)} / ${pool.wait.p99.toFixed(1)} / ${pool.wait.max.toFixed(1)}`);
+                        setHealth('pool-ping', `${pool.pre_ping.p50.toFixed(1)} / ${pool.pre_ping.p99.toFixed(1)}`);
+                        setHealth('pool-errors', `${pool.timeouts} / ${pool.invalidations}`);
+                    }
+                    setHealth('loop-lag', `${data.loop.last_ms.toFixed(1)} / ${data.loop.p99.toFixed(1)} / ${data.loop.max.toFixed(1)}`);
+
                     // Update system stats
                     document.getElementById("cpu-usage").textContent = data.system.cpu + "%";
                     document.getElementById("memory-usage").textContent = data.system.memory + "%";
@@ -489,34 +886,98 @@ async def get_stats(username: str = Depends(verify_admin)):
     return HTMLResponse(content=html_content, status_code=status.HTTP_200_OK)
 
 
+@app.get("/stats/queries", include_in_schema=False)
+async def slow_queries(top: int = Query(20, ge=1, le=500),
+                       order: Literal["total", "max", "mean", "count", "slow"] = "total",
+                       username: str = Depends(verify_admin)):
+    return {
+        "queries": query_stats.top(top, order),
+        "routes": {
+            route: {
+                "requests": stats["requests"],
+                "queries": stats["queries"],
+                "db_time_ms": stats["db_time"] * 1000,
+                "phases_ms": {phase: value * 1000 for phase, value in stats["phases"].items()},
+            }
+            for route, stats in sorted(query_stats.routes.items(), key=lambda item: item[1]["db_time"], reverse=True)
+        },
+    }
+
+
+@app.get("/stats/series", include_in_schema=False)
+async def stats_series(window: str = "24h", endpoint: Optional[str] = None,
+                       username: str = Depends(verify_admin)):
+    try:
+        seconds = ttl_to_seconds(window)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Janela inválida: {window}")
+    end = time.time()
+    return timeseries.series(end - seconds, end, endpoint)
+
+
+@app.get("/stats/profile", include_in_schema=False)
+async def stats_profile(seconds: float = Query(10, gt=0, le=config.PROFILER_MAX_SECONDS),
+                        format: Literal["speedscope", "collapsed"] = "speedscope",
+                        username: str = Depends(verify_admin)):
+    """Amostra este worker por `seconds` segundos e devolve o perfil (speedscope ou flamegraph)."""
+    if profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Já existe um perfil em andamento neste worker")
+    async with profile_lock:
+        profiler = await profile_for(seconds, config.PROFILER_INTERVAL_MS / 1000)
+    return profiler.response(f"{config.APP_NAME} - {seconds:g}s (pid {os.getpid()})", format)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(username: str = Depends(verify_admin)):
+    return PlainTextResponse(await render_metrics(db.engine), media_type=METRICS_CONTENT_TYPE)
+
+
+async def _stats_snapshot() -> dict:
+    return {
+        "endpoints": {
+            path: {
+                "count": stats["count"],
+                "last_minute_count": stats["last_minute_count"],
+                "avg_time": (stats["total_time"] / stats["count"] if stats["count"] > 0 else 0) * 1000
+            } for path, stats in request_stats.items() if path not in excluded_stats_paths
+        },
+        "system": {
+            "cpu": psutil.cpu_percent(),
+            "memory": psutil.virtual_memory().percent,
+            "disk": psutil.disk_usage('/').percent
+        },
+        "monthly": {
+            month: count for month, count in monthly_stats.items()
+        },
+        "cache": {
+            endpoint: {**stats, "hit_ratio": _hit_ratio(stats), "compression_ratio": _compression_ratio(stats),
+                       "prefetch_hit_ratio": _prefetch_hit_ratio(stats)}
+            for endpoint, stats in cache_stats.items()
+        },
+        "cache_budget": {"used": cache_budget.used, "limit": cache_budget.limit},
+        "warmup": warmup_stats,
+        "bloom": _bloom_stats(),
+        "latency": await stats_recorder.latency(),
+        "pool": pool_stats.snapshot(),
+        "loop": loop_monitor.snapshot()
+    }
+
+
+# Um único produtor por worker, ativo apenas com clientes conectados
+stats_broadcaster = StatsBroadcaster(_stats_snapshot, interval=1)
+
+
 @app.websocket("/ws")
 async def stats_ws(websocket: WebSocket):
     await websocket.accept()
+    subscriber = stats_broadcaster.subscribe()
     try:
         while True:
-            # Send updated stats every second
-            await asyncio.sleep(1)
-            stats_data = {
-                "endpoints": {
-                    path: {
-                        "count": stats["count"],
-                        "last_minute_count": stats["last_minute_count"],
-                        "avg_time": (stats["total_time"] / stats["count"] if stats["count"] > 0 else 0) * 1000
-                    } for path, stats in request_stats.items() if path not in excluded_stats_paths
-                },
-                "system": {
-                    "cpu": psutil.cpu_percent(),
-                    "memory": psutil.virtual_memory().percent,
-                    "disk": psutil.disk_usage('/').percent
-                },
-                "monthly": {
-                    month: count for month, count in monthly_stats.items()
-                }
-            }
-            await websocket.send_text(json.dumps(stats_data))
-            
+            await websocket.send_text(await subscriber.get())
     except WebSocketDisconnect:
         pass
+    finally:
+        stats_broadcaster.unsubscribe(subscriber)
 
 
 # Run in terminal
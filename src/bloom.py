@@ -0,0 +1,248 @@
+# src/bloom.py
+import asyncio
+import logging
+import math
+import struct
+import time
+from collections import Counter
+from hashlib import blake2b, blake2s
+from cashews import cache
+from sqlalchemy import select, distinct
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+from sqlalchemy.sql.schema import Column
+from sqlmodel import SQLModel
+from appconfig import Settings
+from src.dataset import dataset
+from src.models import db_schema
+
+logger = logging.getLogger(__name__)
+config = Settings()
+
+_MASK64 = (1 << 64) - 1
+_HEADER = struct.Struct("<QIQ")
+
+
+def _hash64(value) -> int:
+    if isinstance(value, int):
+        # splitmix64: barato e bem distribuído para ids sequenciais
+        z = (value + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return z ^ (z >> 31)
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """Filtro de Bloom: "ausente" é definitivo, "presente" pode ser falso positivo."""
+
+    def __init__(self, capacity: int, fpr: float):
+        capacity = max(capacity, 1)
+        self.m = max(int(-capacity * math.log(fpr) / math.log(2) ** 2), 64)
+        self.k = max(round(self.m / capacity * math.log(2)), 1)
+        self.n = 0
+        self.bits = bytearray((self.m + 7) // 8)
+
+    def _positions(self, value):
+        h = _hash64(value)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return ((h1 + i * h2) % self.m for i in range(self.k))
+
+    def add(self, value):
+        bits = self.bits
+        for pos in self._positions(value):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.n += 1
+
+    def __contains__(self, value) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    @property
+    def expected_fpr(self) -> float:
+        return (1 - math.exp(-self.k * self.n / self.m)) ** self.k
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(self.m, self.k, self.n) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        bloom = cls.__new__(cls)
+        bloom.m, bloom.k, bloom.n = _HEADER.unpack_from(data)
+        bloom.bits = bytearray(data[_HEADER.size:])
+        return bloom
+
+
+class ExistenceIndex:
+    """Filtros de Bloom por tabela e coluna de chave, reconstruídos a cada recarga da base.
+
+    Cada filtro é construído por um único worker e compartilhado pelo Redis, com chave
+    derivada da assinatura da tabela. Consultas com igualdade (ou IN) sobre uma coluna
+    indexada cujo valor está definitivamente ausente podem ser respondidas sem ir ao banco.
+
+    Um "ausente" só é usado depois de conferir que a tabela não mudou desde a construção
+    do filtro (no máximo uma conferência por tabela a cada BLOOM_VERIFY_INTERVAL); uma
+    recarga ainda não vista pelo dataset.watch faz a consulta seguir para o banco.
+    """
+
+    def __init__(self, columns: list[str], fpr: float):
+        self.columns = set(columns)
+        self.fpr = fpr
+        self.filters: dict[tuple[str, str], BloomFilter] = {}
+        self.stats: dict[tuple[str, str], dict] = {}
+        # Assinatura da tabela de que cada filtro foi construído
+        self.built_from: dict[tuple[str, str], tuple | None] = {}
+        self._generation: Counter[tuple[str, str]] = Counter()
+        self._verified_at: dict[str, float] = {}
+        self._verifying: dict[str, asyncio.Task] = {}
+        self._engine: AsyncEngine | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def _indexed_columns(self, tables=None):
+        for table in SQLModel.metadata.sorted_tables:
+            if table.schema != db_schema or (tables is not None and table.name not in tables):
+                continue
+            for column in table.columns:
+                if column.name in self.columns:
+                    yield table, column
+
+    def register(self, monitor):
+        """Reconstrói apenas os filtros das tabelas alteradas em cada recarga."""
+        for table in {table.name for table, _ in self._indexed_columns()}:
+            monitor.on_change([table], lambda engine, table=table: self.rebuild(engine, {table}))
+
+    async def rebuild(self, engine: AsyncEngine, tables=None):
+        self._engine = engine
+        builds = []
+        for table, column in self._indexed_columns(tables):
+            # Filtros antigos dariam falsos negativos para ids recém-carregados
+            self.filters.pop((table.name, column.name), None)
+            self._generation[(table.name, column.name)] += 1
+            builds.append((table, column, self._generation[(table.name, column.name)],
+                           dataset.signatures.get(table.name)))
+        task = asyncio.create_task(self._build_all(engine, builds))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _build_all(self, engine: AsyncEngine, builds: list):
+        for table, column, generation, source in builds:
+            try:
+                await self._load_or_build(engine, table, column, generation, source)
+            except Exception as e:
+                logger.warning(f"Falha ao construir filtro de Bloom de {table.name}.{column.name}: {e!r}")
+
+    async def _load_or_build(self, engine: AsyncEngine, table, column, generation: int, source: tuple | None):
+        signature = blake2s(repr(source).encode(), digest_size=6).hexdigest()
+        key = f"api:bloom:{table.name}:{column.name}:{signature}"
+        data = await cache.get(key)
+        if data is None:
+            async with cache.lock(f"{key}:lock", expire=config.CACHE_LOCK_TTL * 5):
+                data = await cache.get(key)
+                if data is None:
+                    async with engine.connect() as conn:
+                        result = await conn.execute(select(distinct(column)).where(column.is_not(None)))
+                        values = result.scalars().all()
+                    bloom = await asyncio.to_thread(self._build, values)
+                    data = bloom.to_bytes()
+                    await cache.set(key, data, expire="7d")
+        if self._generation[(table.name, column.name)] != generation:
+            # Uma recarga mais nova começou durante a construção: este filtro já nasceu velho
+            return
+        bloom = BloomFilter.from_bytes(data)
+        self.filters[(table.name, column.name)] = bloom
+        self.built_from[(table.name, column.name)] = source
+        stats = self.stats.setdefault((table.name, column.name), {
+            "checks": 0, "negatives": 0, "false_positives": 0, "lookup_negatives": 0
+        })
+        stats.update(items=bloom.n, size_bytes=len(bloom.bits), expected_fpr=bloom.expected_fpr)
+
+    def _build(self, values) -> BloomFilter:
+        bloom = BloomFilter(len(values), self.fpr)
+        for value in values:
+            bloom.add(value)
+        return bloom
+
+    async def absent_values(self, table: str, column: str, values, lookup: bool = False) -> set | None:
+        """Valores certamente ausentes da coluna, ou None sem filtro utilizável.
+
+        `lookup` marca as buscas por id do cache de linhas, único caminho em que os falsos
+        positivos são medidos; os negativos desse caminho entram na taxa observada.
+        """
+        bloom = self.filters.get((table, column))
+        if bloom is None:
+            return None
+        absent = {value for value in values if value not in bloom}
+        if absent and not await self._confirm(table):
+            return None
+        stats = self.stats[(table, column)]
+        stats["checks"] += len(values)
+        stats["negatives"] += len(absent)
+        if lookup:
+            stats["lookup_negatives"] += len(absent)
+        return absent
+
+    async def _confirm(self, table: str) -> bool:
+        # Conferência recente vale para todos; senão uma única consulta por tabela em andamento
+        if time.monotonic() - self._verified_at.get(table, float("-inf")) < config.BLOOM_VERIFY_INTERVAL:
+            return True
+        task = self._verifying.get(table)
+        if task is None:
+            task = asyncio.create_task(self._verify(table))
+            self._verifying[table] = task
+            task.add_done_callback(lambda _: self._verifying.pop(table, None))
+        return await asyncio.shield(task)
+
+    async def _verify(self, table: str) -> bool:
+        try:
+            current = (await dataset.read_signatures(self._engine)).get(table)
+        except Exception as e:
+            logger.warning(f"Falha ao conferir a versão de {table} para os filtros de Bloom: {e!r}")
+            return False
+        stale = [key for key, source in self.built_from.items() if key[0] == table and source != current]
+        if stale:
+            for key in stale:
+                self.filters.pop(key, None)
+                self.built_from.pop(key, None)
+            # Recarga ainda não vista pelo watch: a verificação antecipada reconstrói os filtros
+            dataset.request_refresh(self._engine)
+            return False
+        self._verified_at[table] = time.monotonic()
+        return True
+
+    def record_false_positive(self, table: str, column: str):
+        if (table, column) in self.stats:
+            self.stats[(table, column)]["false_positives"] += 1
+
+    def observed_fpr(self, stats: dict) -> float:
+        # Falsos positivos e negativos verdadeiros do mesmo caminho: as buscas por id do cache de linhas
+        total = stats["false_positives"] + stats["lookup_negatives"]
+        return stats["false_positives"] / total if total > 0 else 0.0
+
+    async def excludes(self, query) -> bool:
+        """True se algum filtro de igualdade/IN da consulta aponta um valor certamente inexistente."""
+        where = query.whereclause
+        if where is None or not self.filters:
+            return False
+        clauses = where.clauses if isinstance(where, BooleanClauseList) and where.operator is operators.and_ else [where]
+        for clause in clauses:
+            if not isinstance(clause, BinaryExpression) or not isinstance(clause.left, Column):
+                continue
+            if not isinstance(clause.right, BindParameter):
+                continue
+            table, column, value = clause.left.table.name, clause.left.name, clause.right.value
+            if (table, column) not in self.filters:
+                continue
+            if clause.operator is operators.eq:
+                values = {value}
+            elif clause.operator is operators.in_op and value:
+                values = set(value)
+            else:
+                continue
+            absent = await self.absent_values(table, column, values)
+            if absent is not None and absent == values:
+                return True
+        return False
+
+
+existence_index = ExistenceIndex(config.BLOOM_KEY_COLUMNS, config.BLOOM_FPR)
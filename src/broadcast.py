@@ -0,0 +1,104 @@
+# src/broadcast.py
+import asyncio
+import logging
+from typing import Awaitable, Callable
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def merge_patch(old: dict, new: dict) -> dict:
+    """Diferença entre dois dicionários no formato JSON Merge Patch (RFC 7386):
+    só as chaves alteradas, e null para as removidas."""
+    patch = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif value != previous:
+            patch[key] = value
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    return patch
+
+
+class Subscriber:
+    def __init__(self, max_frames: int):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_frames)
+        # False até receber um quadro completo; volta a False se perder quadros
+        self.synced = False
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class StatsBroadcaster:
+    """Produtor único de quadros de estatísticas para todos os clientes do /ws.
+
+    A cada intervalo gera um snapshot, calcula uma única diferença em relação ao
+    anterior e a serializa uma vez; clientes novos (ou atrasados) recebem o snapshot
+    completo. O produtor só roda enquanto houver inscritos.
+    """
+
+    def __init__(self, snapshot: Callable[[], Awaitable[dict]], interval: float = 1.0, max_frames: int = 8):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.max_frames = max_frames
+        self._subscribers: set[Subscriber] = set()
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.max_frames)
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        previous = None
+        while self._subscribers:
+            try:
+                # Cópia desacoplada dos dicionários vivos, já no formato JSON
+                current = orjson.loads(orjson.dumps(await self.snapshot(), option=orjson.OPT_NON_STR_KEYS))
+            except Exception as e:
+                logger.warning(f"Falha ao gerar snapshot de estatísticas: {e!r}")
+                await asyncio.sleep(self.interval)
+                continue
+            full = delta = None
+            for subscriber in list(self._subscribers):
+                if subscriber.synced and previous is not None:
+                    if delta is None:
+                        patch = merge_patch(previous, current)
+                        delta = orjson.dumps({"type": "delta", "data": patch}).decode() if patch else ""
+                    frame = delta
+                else:
+                    if full is None:
+                        full = orjson.dumps({"type": "full", "data": current}).decode()
+                    frame = full
+                    subscriber.synced = True
+                if not frame:
+                    continue
+                try:
+                    subscriber.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    # Cliente lento: descarta o que está na fila e ressincroniza no próximo quadro
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    subscriber.synced = False
+            previous = current
+            await asyncio.sleep(self.interval)
@@ -1,8 +1,599 @@
 # src/cache.py
+import asyncio
+import inspect
+import logging
+import pickle
+import time
+import uuid
+import zlib
+from collections import Counter, defaultdict, OrderedDict
+from contextlib import asynccontextmanager, AsyncExitStack
+from contextvars import ContextVar
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+from typing import Any, NamedTuple
+from hashlib import blake2b
+from urllib.parse import parse_qsl
+import orjson
+import zstandard
 from cashews import cache
+from cashews.decorators.cache.defaults import context_cache_detect
+from cashews.ttl import ttl_to_seconds
+from fastapi import HTTPException, params as fastapi_params
+from fastapi.routing import APIRoute
+from pydantic_core import PydanticUndefined
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from appconfig import Settings
+from src.dataset import dataset
+
+config = Settings()
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "api"
+_MISS = object()
+_WARNING_STALE = '110 - "Response is Stale"'
+_WARNING_REVALIDATION_FAILED = '111 - "Revalidation Failed"'
+
+# Acertos e falhas por endpoint, para dimensionar o Redis a partir da taxa de acerto medida
+cache_stats = defaultdict(lambda: {
+    "hits": 0, "misses": 0, "stale": 0, "refresh_errors": 0,
+    "raw_bytes": 0, "stored_bytes": 0, "not_cached": 0,
+    "prefetches": 0, "prefetch_hits": 0
+})
+
+_response_info: ContextVar[dict | None] = ContextVar("cache_response_info", default=None)
+# Marca no scope ASGI das consultas reexecutadas pelo warm-up; posta só dentro do processo
+WARMUP_SCOPE_KEY = "api.cache_warmup"
+_refreshing: set[str] = set()
+_failed_refresh: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+# Paginação sequencial: última página pedida por consulta e páginas buscadas antecipadamente
+PAGE_PARAM = "pagina"
+_page_sequences: OrderedDict[str, int] = OrderedDict()
+_prefetched: OrderedDict[str, bool] = OrderedDict()
+_prefetch_slots = asyncio.Semaphore(config.CACHE_PREFETCH_CONCURRENCY)
+
+# Acessos por chave neste worker, usados para escolher as entradas do snapshot
+hot_keys: Counter[str] = Counter()
+
 
 def setup_cache(settings):
     # Setup cache server
-    cache.setup(settings.CACHE_SERVER_URL, 
+    cache.setup(settings.CACHE_SERVER_URL,
                 enable=True,
                 suppress=False)
+
+
+_CODEC_ZSTD = b"Z"
+_CODEC_ZLIB = b"D"
+_CODEC_NONE = b"N"
+
+
+def encode_value(value) -> tuple[bytes, int]:
+    """Serializa e comprime um valor do cache; devolve o payload e o tamanho sem compressão."""
+    raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(raw) < config.CACHE_COMPRESSION_MIN_BYTES or config.CACHE_COMPRESSION == "none":
+        return _CODEC_NONE + raw, len(raw)
+    if config.CACHE_COMPRESSION == "zlib":
+        return _CODEC_ZLIB + zlib.compress(raw, config.CACHE_COMPRESSION_LEVEL), len(raw)
+    compressor = zstandard.ZstdCompressor(level=config.CACHE_COMPRESSION_LEVEL)
+    return _CODEC_ZSTD + compressor.compress(raw), len(raw)
+
+
+def decode_value(payload: bytes):
+    codec, data = payload[:1], payload[1:]
+    if codec == _CODEC_ZSTD:
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == _CODEC_ZLIB:
+        data = zlib.decompress(data)
+    return pickle.loads(data)
+
+
+class CacheBudget:
+    """Limite de memória da aplicação no Redis compartilhado.
+
+    Os bytes gravados são somados em contadores por janela de tempo que expiram junto com
+    as entradas da janela, compartilhados entre os workers. O tamanho de cada entrada fica
+    ao lado dela (`<chave>:size`, com a janela em que foi contado), então uma sobrescrita
+    (ex.: recálculo do stale-while-revalidate) troca o tamanho antigo pelo novo em vez de
+    somar os dois.
+    """
+
+    def __init__(self, limit: int, retention: int, bucket: int = 300):
+        self.limit = limit
+        self.retention = retention
+        self.bucket = bucket
+        self.used = 0
+        self._checked_at = 0.0
+
+    def _bucket_key(self, index: int) -> str:
+        return f"{KEY_PREFIX}:budget:{index}"
+
+    async def usage(self) -> int:
+        # Consulta o Redis no máximo uma vez a cada 5 segundos
+        if time.monotonic() - self._checked_at > 5:
+            current = int(time.time() // self.bucket)
+            first = current - self.retention // self.bucket - 1
+            values = await cache.get_many(*(self._bucket_key(i) for i in range(first, current + 1)))
+            self.used = sum(int(v or 0) for v in values)
+            self._checked_at = time.monotonic()
+        return self.used
+
+    async def reserve(self, key: str, size: int, expire: float) -> bool:
+        """Reserva `size` bytes para `key`, descontando o que já estava contado para ela."""
+        return await self.reserve_many({key: size}, expire)
+
+    async def reserve_many(self, sizes: dict[str, int], expire: float) -> bool:
+        """Reserva os bytes de várias entradas de uma vez (todas ou nenhuma)."""
+        previous = await cache.get_many(*(f"{key}:size" for key in sizes))
+        released = Counter()
+        for marker in previous:
+            if marker:
+                released[marker[0]] += marker[1]
+        total = sum(sizes.values())
+        delta = total - sum(released.values())
+        if await self.usage() + delta > self.limit:
+            return False
+        index = int(time.time() // self.bucket)
+        # A janela da gravação anterior vive mais que a própria entrada, então ainda existe
+        for previous_index, size in released.items():
+            await cache.incr(self._bucket_key(previous_index), -size)
+        await cache.incr(self._bucket_key(index), total, expire=self.retention + self.bucket)
+        await cache.set_many({f"{key}:size": (index, size) for key, size in sizes.items()}, expire=expire)
+        self.used += delta
+        return True
+
+
+cache_budget = CacheBudget(
+    config.CACHE_MEMORY_BUDGET,
+    ttl_to_seconds(config.CACHE_TTL) + ttl_to_seconds(config.CACHE_STALE_TTL)
+)
+
+
+def _param_default(param: inspect.Parameter):
+    default = param.default
+    if isinstance(default, fastapi_params.Param):
+        default = default.default
+    return None if default in (PydanticUndefined, Ellipsis, inspect.Parameter.empty) else default
+
+
+def normalize_arguments(arguments: dict) -> dict:
+    """Remove os espaços nas pontas dos valores string já validados.
+
+    Os argumentos seguem para o endpoint; padrões e dependências só são descartados
+    na chave, por build_cache_key.
+    """
+    normalized = {}
+    for name, value in arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+        normalized[name] = value
+    return normalized
+
+
+def build_cache_key(func, signature: inspect.Signature, arguments: dict) -> str:
+    """Chave determinística: endpoint + versão da base + hash dos parâmetros relevantes.
+
+    Dependências injetadas (sessão do banco etc.) são ignoradas, assim como parâmetros
+    ausentes ou iguais ao padrão, e a ordem dos parâmetros na URL não importa.
+    """
+    relevant = {}
+    for name, param in signature.parameters.items():
+        if isinstance(param.default, fastapi_params.Depends):
+            continue
+        value = arguments.get(name)
+        if value is None or value == _param_default(param):
+            continue
+        relevant[name] = value
+    digest = blake2b(orjson.dumps(relevant, option=orjson.OPT_SORT_KEYS, default=str), digest_size=16)
+    return f"{KEY_PREFIX}:{func.__name__}:{dataset.version}:{digest.hexdigest()}"
+
+
+class CachePolicy(NamedTuple):
+    """TTLs (em segundos) aplicados às respostas de um endpoint."""
+    ttl: int
+    empty_ttl: int
+    error_ttl: int
+    stale_ttl: int
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, ttl=None) -> "CachePolicy":
+        # CACHE_POLICIES[endpoint] > ttl do decorator > padrões globais
+        overrides = config.CACHE_POLICIES.get(endpoint, {})
+        return cls(
+            ttl=ttl_to_seconds(overrides.get("ttl") or ttl or config.CACHE_TTL),
+            empty_ttl=ttl_to_seconds(overrides.get("empty_ttl") or config.CACHE_EMPTY_TTL),
+            error_ttl=ttl_to_seconds(overrides.get("error_ttl") or config.CACHE_ERROR_TTL),
+            stale_ttl=ttl_to_seconds(overrides.get("stale_ttl") or config.CACHE_STALE_TTL),
+        )
+
+
+class _Entry(NamedTuple):
+    stored_at: float
+    ttl: int
+    value: Any
+    error: tuple | None = None  # (status_code, detail) de um HTTPException 4xx
+
+    def unwrap(self):
+        if self.error is not None:
+            raise HTTPException(status_code=self.error[0], detail=self.error[1])
+        return self.value
+
+
+def is_empty_result(result) -> bool:
+    if result is None:
+        return True
+    if isinstance(result, (list, tuple, dict)):
+        return len(result) == 0
+    data = getattr(result, "data", None)
+    return isinstance(data, list) and not data
+
+
+def cached(ttl=None, lock: bool = True, bypass=None):
+    """Substitui o @cache do cashews nos endpoints, usando build_cache_key como chave.
+
+    Os TTLs vêm de CachePolicy: páginas vazias e 404 usam `empty_ttl` e os demais erros 4xx
+    levantados pelo endpoint (ex.: ERROR_MESSAGE_NO_PARAMS) são guardados por `error_ttl`; erros 5xx
+    nunca são armazenados. Vencido o TTL, a entrada continua sendo servida por mais
+    `stale_ttl` enquanto uma única tarefa em segundo plano a recalcula; se o recálculo
+    falhar, a cópia antiga segue sendo servida com o cabeçalho Warning.
+
+    `bypass` recebe os parâmetros de consulta e, se devolver True, o endpoint é chamado
+    direto, sem entrada própria no cache (ex.: consultas servidas pelo cache de linhas).
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        endpoint = func.__name__
+        policy = CachePolicy.for_endpoint(endpoint, ttl)
+
+        async def _lookup(key, arguments):
+            payload = await cache.get(key, default=_MISS)
+            if payload is _MISS:
+                return _MISS
+            try:
+                # Páginas comprimidas de vários MB: descompressão e unpickle fora do event loop
+                if len(payload) > config.CACHE_COMPRESSION_MIN_BYTES:
+                    entry = _Entry(*await asyncio.to_thread(decode_value, payload))
+                else:
+                    entry = _Entry(*decode_value(payload))
+            except Exception as e:
+                # Formato antigo ou corrompido: recalcula
+                logger.debug(f"Entrada de cache ilegível em {key}: {e!r}")
+                return _MISS
+            age = time.time() - entry.stored_at
+            stats = cache_stats[endpoint]
+            _record_access(key)
+            if age <= entry.ttl:
+                stats["hits"] += 1
+                _set_response_info(status="HIT")
+                if _prefetched.pop(key, None):
+                    stats["prefetch_hits"] += 1
+            else:
+                stats["stale"] += 1
+                _set_response_info(
+                    status="STALE",
+                    warning=_WARNING_REVALIDATION_FAILED if key in _failed_refresh else _WARNING_STALE
+                )
+                _schedule(key, _refresh(key, arguments))
+            # Mantém os cabeçalhos do CacheRequestControlMiddleware funcionando
+            context_cache_detect._set(key, ttl=max(int(entry.ttl - age), 0), name="simple", template=endpoint, value=entry.value)
+            return entry.unwrap()
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = normalize_arguments(bound.arguments)
+            if bypass is not None and bypass(_filters(arguments)):
+                return await func(**arguments)
+            key = build_cache_key(func, signature, arguments)
+
+            result = await _get(key, arguments)
+            if PAGE_PARAM in arguments and config.CACHE_PREFETCH_CONCURRENCY:
+                _track_sequence(arguments, result)
+            return result
+
+        def _filters(arguments):
+            return {
+                name: value for name, value in arguments.items()
+                if not isinstance(signature.parameters[name].default, fastapi_params.Depends)
+            }
+
+        async def _get(key, arguments):
+            value = await _lookup(key, arguments)
+            if value is not _MISS:
+                return value
+
+            if lock:
+                async with cache.lock(f"{key}:lock", expire=config.CACHE_LOCK_TTL):
+                    # Outra requisição pode ter preenchido a chave enquanto aguardávamos o lock
+                    value = await _lookup(key, arguments)
+                    if value is not _MISS:
+                        return value
+                    return await _compute(key, arguments)
+            return await _compute(key, arguments)
+
+        async def _execute(arguments) -> _Entry:
+            try:
+                result = await func(**arguments)
+            except HTTPException as e:
+                if e.status_code >= 500:
+                    raise
+                # 404 é um resultado vazio (ex.: nr_convenio ainda não carregado), não um erro da consulta
+                entry_ttl = policy.empty_ttl if e.status_code == 404 else policy.error_ttl
+                return _Entry(time.time(), entry_ttl, None, (e.status_code, e.detail))
+            return _Entry(time.time(), policy.empty_ttl if is_empty_result(result) else policy.ttl, result)
+
+        async def _compute(key, arguments):
+            cache_stats[endpoint]["misses"] += 1
+            _set_response_info(status="MISS")
+            entry = await _execute(arguments)
+            await _store(key, entry, admitted=_get_response_info("warmup", False))
+            return entry.unwrap()
+
+        async def _store(key, entry: _Entry, admitted: bool):
+            stats = cache_stats[endpoint]
+            # Páginas de 1000 registros ocupam alguns MB; a compressão roda fora do event loop
+            payload, raw_size = await asyncio.to_thread(encode_value, tuple(entry))
+            size = len(payload)
+
+            if size > config.CACHE_MAX_ENTRY_BYTES:
+                stats["not_cached"] += 1
+                return
+            # Entradas grandes só entram no cache na segunda vez em que são pedidas
+            if size > config.CACHE_ADMISSION_BYTES and not admitted:
+                if await cache.set(f"{key}:seen", 1, expire=entry.ttl, exist=False):
+                    stats["not_cached"] += 1
+                    return
+            if not await cache_budget.reserve(key, size, entry.ttl + policy.stale_ttl):
+                stats["not_cached"] += 1
+                logger.warning(f"Orçamento de memória do cache esgotado; {endpoint} não armazenado")
+                return
+
+            await cache.set(key, payload, expire=entry.ttl + policy.stale_ttl)
+            stats["raw_bytes"] += raw_size
+            stats["stored_bytes"] += size
+
+        async def _refresh(key, arguments):
+            # Um único recálculo por chave entre todos os workers
+            token = str(uuid.uuid4())
+            if not await cache.set_lock(f"{key}:refresh", token, expire=config.CACHE_LOCK_TTL):
+                return
+            try:
+                async with resolve_dependencies(signature) as dependencies:
+                    entry = await _execute({**arguments, **dependencies})
+                # A chave já estava no cache, então não passa de novo pela admissão
+                await _store(key, entry, admitted=True)
+                _failed_refresh.discard(key)
+            except Exception as e:
+                cache_stats[endpoint]["refresh_errors"] += 1
+                _failed_refresh.add(key)
+                logger.warning(f"Falha ao recalcular cache de {endpoint}; mantendo cópia antiga: {e!r}")
+            finally:
+                await cache.unlock(f"{key}:refresh", token)
+
+        def _track_sequence(arguments, result):
+            # Quem percorre pagina=1..N com os mesmos filtros recebe a página seguinte já em cache
+            page = arguments[PAGE_PARAM]
+            sequence = build_cache_key(func, signature, {**arguments, PAGE_PARAM: None})
+            previous = _page_sequences.pop(sequence, None)
+            _lru_put(_page_sequences, sequence, page)
+            if previous != page - 1 or page >= getattr(result, "total_pages", page + 1):
+                return
+            next_arguments = {**arguments, PAGE_PARAM: page + 1}
+            next_key = build_cache_key(func, signature, next_arguments)
+            # Sem vaga livre a antecipação é descartada, nunca enfileirada
+            if next_key not in _refreshing and not _prefetch_slots.locked():
+                _schedule(next_key, _prefetch(next_key, next_arguments))
+
+        async def _prefetch(key, arguments):
+            async with _prefetch_slots:
+                if await cache.exists(key):
+                    return
+                try:
+                    async with resolve_dependencies(signature) as dependencies:
+                        entry = await _execute({**arguments, **dependencies})
+                    await _store(key, entry, admitted=True)
+                except Exception as e:
+                    logger.debug(f"Falha ao antecipar página de {endpoint}: {e!r}")
+                    return
+                cache_stats[endpoint]["prefetches"] += 1
+                _lru_put(_prefetched, key, True)
+
+        # Permite ao warm-up identificar as rotas servidas pelo cache
+        wrapper.__cached__ = True
+        return wrapper
+
+    return decorator
+
+
+@asynccontextmanager
+async def resolve_dependencies(signature: inspect.Signature):
+    """Abre novas instâncias das dependências injetadas (ex.: sessão do banco) para
+    chamadas feitas fora do ciclo da requisição."""
+    async with AsyncExitStack() as stack:
+        resolved = {}
+        for name, param in signature.parameters.items():
+            if not isinstance(param.default, fastapi_params.Depends):
+                continue
+            dependency = param.default.dependency
+            if inspect.isasyncgenfunction(dependency):
+                resolved[name] = await stack.enter_async_context(asynccontextmanager(dependency)())
+            elif inspect.iscoroutinefunction(dependency):
+                resolved[name] = await dependency()
+            else:
+                resolved[name] = dependency()
+        yield resolved
+
+
+def _schedule(key: str, coro):
+    if key in _refreshing:
+        coro.close()
+        return
+    _refreshing.add(key)
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(lambda t: (_background_tasks.discard(t), _refreshing.discard(key)))
+
+
+def cached_routes(app) -> list[APIRoute]:
+    """Rotas GET cujos endpoints usam o decorator @cached."""
+    return [
+        route for route in app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods
+        and getattr(route.endpoint, "__cached__", False)
+    ]
+
+
+def _record_access(key: str):
+    if not config.CACHE_SNAPSHOT_ENABLED:
+        return
+    hot_keys[key] += 1
+    # Mantém só as chaves mais acessadas quando o contador cresce demais
+    if len(hot_keys) > config.CACHE_SNAPSHOT_KEYS * 10:
+        for stale_key, _ in hot_keys.most_common()[config.CACHE_SNAPSHOT_KEYS:]:
+            del hot_keys[stale_key]
+
+
+def _lru_put(lru: OrderedDict, key, value):
+    lru[key] = value
+    lru.move_to_end(key)
+    while len(lru) > config.CACHE_PREFETCH_TRACKED:
+        lru.popitem(last=False)
+
+
+def _set_response_info(**info):
+    response_info = _response_info.get()
+    if response_info is not None:
+        response_info.update(info)
+
+
+def _get_response_info(name: str, default=None):
+    response_info = _response_info.get()
+    return default if response_info is None else response_info.get(name, default)
+
+
+class CacheStatusMiddleware:
+    """Expõe o resultado do cache da requisição nos cabeçalhos X-Cache e Warning."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        info = {}
+        # Consultas do warm-up já são sabidamente frequentes e dispensam a admissão.
+        # A marca vem do scope, nunca de um cabeçalho que o cliente possa enviar
+        if scope.get(WARMUP_SCOPE_KEY):
+            info["warmup"] = True
+        token = _response_info.set(info)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "status" in info:
+                    headers["X-Cache"] = info["status"]
+                if "warning" in info:
+                    headers["Warning"] = info["warning"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _response_info.reset(token)
+
+
+class DatasetEtagMiddleware:
+    """ETag e Last-Modified derivados da versão da base, sem consultar Postgres ou Redis.
+
+    Como os dados só mudam quando os dumps são recarregados e o formato só muda a cada
+    deploy, a versão da base, o build (API_BUILD e esquema OpenAPI) e a consulta normalizada
+    identificam a resposta, e If-None-Match/If-Modified-Since são respondidos com 304 antes
+    de chegar ao endpoint. Last-Modified é o instante em que a versão da base ou o build,
+    o mais recente, foi visto pela primeira vez, compartilhado entre workers pelo cache.
+    If-None-Match: * não é respondido aqui, pois a consulta ainda não foi validada.
+    """
+
+    def __init__(self, app, max_age: int = 300):
+        self.app = app
+        self.max_age = max_age
+        self._routes = None
+        self._build: tuple[str, float] | None = None
+
+    async def _build_version(self, app) -> tuple[str, float]:
+        # Campos novos, defaults e validação mudam o esquema; API_BUILD cobre o restante do deploy
+        if self._build is None:
+            schema = orjson.dumps([config.API_BUILD, app.openapi()], option=orjson.OPT_SORT_KEYS)
+            build = blake2b(schema, digest_size=6).hexdigest()
+            self._build = (build, await dataset.first_seen(f"build:{build}", time.time()))
+        return self._build
+
+    def _is_cached(self, scope) -> bool:
+        if self._routes is None:
+            self._routes = cached_routes(scope["app"])
+        for route in self._routes:
+            if route.path_regex.match(scope["path"]):
+                # Como faria o roteador: um 304 respondido aqui é contabilizado no template da rota
+                scope["route"] = route
+                return True
+        return False
+
+    def _etag(self, scope, build: str) -> str:
+        query = sorted(
+            (name, value.strip())
+            for name, value in parse_qsl(scope["query_string"].decode("latin-1"))
+            if value.strip()
+        )
+        digest = blake2b(orjson.dumps([build, scope["path"], query]), digest_size=8).hexdigest()
+        return f'W/"{dataset.version}-{digest}"'
+
+    def _not_modified(self, request_headers: Headers, etag: str, last_modified: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(","))
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= int(last_modified)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] not in ("GET", "HEAD")
+                or not dataset.version_seen_at or not self._is_cached(scope)):
+            return await self.app(scope, receive, send)
+
+        build, build_seen_at = await self._build_version(scope["app"])
+        etag = self._etag(scope, build)
+        last_modified = max(dataset.version_seen_at, build_seen_at)
+        validators = {
+            "ETag": etag,
+            "Last-Modified": formatdate(last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={self.max_age}",
+        }
+
+        if self._not_modified(Headers(scope=scope), etag, last_modified):
+            response = Response(status_code=304, headers=validators)
+            return await response(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] == 200:
+                    headers.update(validators)
+                elif message["status"] == 404:
+                    # Ausente nesta versão da base: o CDN pode absorvê-lo. Erros de validação
+                    # (400/422) não, pois as regras mudam entre deploys
+                    headers["Cache-Control"] = validators["Cache-Control"]
+                # Age do cashews é o tempo restante no Redis e faria o CDN descartar a resposta
+                if "age" in headers:
+                    del headers["age"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -6,6 +6,7 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from appconfig import Settings
 import logging
 from tenacity import retry, stop_after_attempt, wait_fixed
+from src.health import InstrumentedQueuePool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,10 +23,12 @@ class Database:
         self.engine = create_async_engine(
             settings.DATABASE_URL,  # MUST be postgresql+asyncpg://...
             future=True,
-            pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20,
-            pool_recycle=3600  # recycle the connections after 1 hour (3600 seconds)
+            poolclass=InstrumentedQueuePool,  # mede a espera por conexão (ver src.health)
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE
         )
         
         # Test connection
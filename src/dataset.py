@@ -0,0 +1,111 @@
+import asyncio
+import time
+import logging
+from hashlib import blake2s
+from typing import Awaitable, Callable
+from cashews import cache
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.models import db_schema
+
+logger = logging.getLogger(__name__)
+
+# Por quanto tempo o instante em que cada versão foi vista fica guardado no cache
+_VERSION_SEEN_TTL = 90 * 24 * 3600
+
+# Contadores de escrita por tabela; mudam sempre que os dumps são recarregados
+_SIGNATURE_QUERY = text("""
+    SELECT relname, n_tup_ins, n_tup_upd, n_tup_del
+    FROM pg_stat_user_tables
+    WHERE schemaname = :schema
+""")
+
+
+class DatasetMonitor:
+    """Detecta recargas da base comparando os contadores de escrita do Postgres.
+
+    A versão é derivada apenas das assinaturas das tabelas, de modo que é a mesma
+    em todos os workers e sobrevive a reinícios da aplicação enquanto os dados não mudarem.
+    """
+
+    def __init__(self):
+        self.signatures: dict[str, tuple] = {}
+        self.loaded_at: dict[str, float] = {}
+        self.version: str = "0"
+        # Quando a versão atual foi vista pela primeira vez por qualquer worker (Last-Modified)
+        self.version_seen_at: float = 0.0
+        self._listeners: list[tuple[frozenset, Callable[[AsyncEngine], Awaitable[None]]]] = []
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    def on_change(self, tables, callback: Callable[[AsyncEngine], Awaitable[None]]):
+        # tables=None registra o callback para qualquer tabela
+        self._listeners.append((frozenset(tables or ()), callback))
+
+    async def read_signatures(self, engine: AsyncEngine) -> dict[str, tuple]:
+        """Assinaturas atuais das tabelas, sem atualizar a versão nem avisar os ouvintes."""
+        async with engine.connect() as conn:
+            result = await conn.execute(_SIGNATURE_QUERY, {"schema": db_schema})
+            return {row[0]: tuple(row[1:]) for row in result}
+
+    def request_refresh(self, engine: AsyncEngine):
+        """Antecipa a próxima verificação (ex.: quem notou uma tabela alterada antes do watch)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh(engine))
+
+    async def refresh(self, engine: AsyncEngine) -> set[str]:
+        # O watch e as verificações antecipadas não processam a mesma recarga duas vezes
+        async with self._refresh_lock:
+            return await self._refresh(engine)
+
+    async def _refresh(self, engine: AsyncEngine) -> set[str]:
+        signatures = await self.read_signatures(engine)
+
+        changed = {
+            table for table in signatures.keys() | self.signatures.keys()
+            if signatures.get(table) != self.signatures.get(table)
+        }
+        if not changed:
+            return changed
+
+        now = time.time()
+        for table in changed:
+            self.loaded_at[table] = now
+        self.signatures = signatures
+        digest = blake2s(repr(sorted(signatures.items())).encode(), digest_size=6)
+        self.version = digest.hexdigest()
+        self.version_seen_at = await self.first_seen(f"dataset:{self.version}", now)
+        logger.info(f"Versão da base: {self.version} ({len(changed)} tabela(s) alterada(s))")
+
+        for tables, callback in self._listeners:
+            if tables and not (tables & changed):
+                continue
+            try:
+                await callback(engine)
+            except Exception as e:
+                logger.error(f"Erro ao processar recarga da base em {callback.__qualname__}: {e!r}")
+        return changed
+
+    async def first_seen(self, name: str, now: float) -> float:
+        """Instante em que uma versão (da base, do build) foi vista pela primeira vez por qualquer worker.
+
+        O primeiro worker a vê-la grava o instante; os demais, e os reinícios, o reaproveitam.
+        """
+        key = f"api:{name}:seen"
+        try:
+            await cache.set(key, now, expire=_VERSION_SEEN_TTL, exist=False)
+            return float(await cache.get(key, default=now))
+        except Exception as e:
+            logger.warning(f"Falha ao ler o instante da versão {name} no cache: {e!r}")
+            return now
+
+    async def watch(self, engine: AsyncEngine, interval: int):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh(engine)
+            except Exception as e:
+                logger.warning(f"Falha ao verificar versão da base: {e!r}")
+
+
+dataset = DatasetMonitor()
@@ -0,0 +1,223 @@
+# src/dbstats.py
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from hashlib import blake2s
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from appconfig import Settings
+from src.stats import bucket_index
+
+config = Settings()
+# Arquivo rotativo configurado em log_conf.yaml
+slow_logger = logging.getLogger("api.slow_queries")
+
+# Etapa de get_paginated_data em execução (count, page, refresh); "query" fora dela
+_phase: ContextVar[str] = ContextVar("db_phase", default="query")
+# Acumulador da requisição corrente, criado em track_requests
+_request: ContextVar[dict | None] = ContextVar("db_request", default=None)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+# Intervalo mínimo entre dois EXPLAIN ANALYZE do mesmo formato de consulta
+_EXPLAIN_INTERVAL = 600
+
+
+@contextmanager
+def db_phase(name: str):
+    """Atribui as consultas executadas no bloco à etapa informada."""
+    token = _phase.set(name)
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+
+
+@lru_cache(maxsize=2048)
+def normalize(statement: str) -> tuple[str, str]:
+    """SQL normalizado (parâmetros e literais como ?, listas IN colapsadas) e sua impressão digital."""
+    sql = _PLACEHOLDER.sub("?", statement)
+    sql = _LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    return sql, blake2s(sql.encode(), digest_size=8).hexdigest()
+
+
+def _bind_shape(parameters, executemany: bool) -> list[str]:
+    if executemany:
+        return [f"{len(parameters)} x {_bind_shape(parameters[0], False) if parameters else []}"]
+    values = parameters.values() if isinstance(parameters, dict) else (parameters or ())
+    return [
+        f"{type(value).__name__}[{len(value)}]" if isinstance(value, (list, tuple)) else type(value).__name__
+        for value in values
+    ]
+
+
+class QueryStats:
+    """Duração das consultas ao banco, medida nos eventos de cursor do SQLAlchemy.
+
+    Além do histograma global, agrega o tempo por formato de consulta (SQL normalizado)
+    e por template de rota/etapa, e grava as consultas acima de SLOW_QUERY_MS no log
+    de consultas lentas, com o plano de execução de uma amostra delas.
+    """
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.sum = 0.0
+        self.errors = 0
+        self.shapes: dict[str, dict] = {}
+        self.routes = defaultdict(lambda: {"requests": 0, "queries": 0, "db_time": 0.0, "phases": Counter()})
+        self._engine = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def instrument(self, engine: AsyncEngine):
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        event.listen(sync_engine, "handle_error", self._error)
+
+    def begin_request(self, scope: dict) -> Token:
+        return _request.set({"scope": scope, "queries": 0, "db_time": 0.0, "phases": Counter()})
+
+    def current(self) -> dict | None:
+        """Acumulador da requisição em andamento, se houver."""
+        return _request.get()
+
+    def end_request(self, token: Token) -> dict:
+        """Encerra a requisição e soma o tempo de banco ao template da rota."""
+        info = _request.get()
+        _request.reset(token)
+        route = info["scope"].get("route")
+        if route is not None:
+            stats = self.routes[route.path]
+            stats["requests"] += 1
+            stats["queries"] += info["queries"]
+            stats["db_time"] += info["db_time"]
+            stats["phases"].update(info["phases"])
+        return info
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        phase = _phase.get()
+        if phase == "explain":
+            return
+        self.buckets[bucket_index(int(elapsed * 1_000_000))] += 1
+        self.sum += elapsed
+
+        info = _request.get()
+        route = None
+        if info is not None:
+            # Na etapa "page", as consultas após a primeira são os selectinload
+            if phase == "page" and info["phases"]["page"]:
+                phase = "selectinload"
+            info["queries"] += 1
+            info["db_time"] += elapsed
+            info["phases"][phase] += elapsed
+            route = info["scope"].get("route")
+            route = route.path if route is not None else info["scope"].get("path")
+
+        sql, fingerprint = normalize(statement)
+        shape = self._shape(sql, fingerprint)
+        shape["count"] += 1
+        shape["total"] += elapsed
+        shape["max"] = max(shape["max"], elapsed)
+        if route is not None:
+            shape["routes"][route] += 1
+        if elapsed * 1000 >= config.SLOW_QUERY_MS:
+            shape["slow"] += 1
+            self._log_slow(shape, statement, parameters, executemany, elapsed, route, phase)
+
+    def _error(self, context):
+        self.errors += 1
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    def _shape(self, sql: str, fingerprint: str) -> dict:
+        shape = self.shapes.get(fingerprint)
+        if shape is None:
+            if len(self.shapes) >= config.QUERY_SHAPES_TRACKED:
+                # Descarta o formato de menor tempo acumulado
+                del self.shapes[min(self.shapes, key=lambda key: self.shapes[key]["total"])]
+            shape = self.shapes[fingerprint] = {
+                "fingerprint": fingerprint, "sql": sql, "count": 0, "total": 0.0, "max": 0.0,
+                "slow": 0, "routes": Counter(), "plan": None, "explained_at": 0.0,
+            }
+        return shape
+
+    def _log_slow(self, shape: dict, statement: str, parameters, executemany: bool, elapsed: float,
+                  route: str | None, phase: str):
+        record = {
+            "fingerprint": shape["fingerprint"],
+            "duration_ms": round(elapsed * 1000, 1),
+            "route": route,
+            "phase": phase,
+            "sql": shape["sql"],
+            "bind_shape": _bind_shape(parameters, executemany),
+        }
+        now = time.time()
+        explain = (
+            self._engine is not None and not executemany
+            and shape["sql"].upper().startswith(("SELECT", "WITH"))
+            and now - shape["explained_at"] >= _EXPLAIN_INTERVAL
+            and random.random() < config.SLOW_QUERY_EXPLAIN_RATE
+        )
+        if explain:
+            try:
+                task = asyncio.get_running_loop().create_task(self._explain(shape, record, statement, parameters))
+            except RuntimeError:
+                explain = False
+            else:
+                shape["explained_at"] = now
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        if not explain:
+            slow_logger.warning(orjson.dumps(record).decode())
+
+    async def _explain(self, shape: dict, record: dict, statement: str, parameters):
+        # Reexecuta a consulta em outra conexão: só SELECTs, e a transação é descartada
+        token = _phase.set("explain")
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                shape["plan"] = record["plan"] = "\n".join(row[0] for row in result)
+        except Exception as e:
+            record["plan_error"] = repr(e)
+        finally:
+            _phase.reset(token)
+        slow_logger.warning(orjson.dumps(record).decode())
+
+    def top(self, n: int, order: str = "total") -> list[dict]:
+        """Formatos de consulta mais lentos, ordenados por total, max, mean ou count."""
+        def key(shape):
+            return shape["total"] / shape["count"] if order == "mean" else shape[order]
+        return [
+            {
+                "fingerprint": shape["fingerprint"],
+                "sql": shape["sql"],
+                "count": shape["count"],
+                "total_ms": shape["total"] * 1000,
+                "mean_ms": shape["total"] / shape["count"] * 1000,
+                "max_ms": shape["max"] * 1000,
+                "slow": shape["slow"],
+                "routes": dict(shape["routes"].most_common(5)),
+                "plan": shape["plan"],
+            }
+            for shape in sorted(self.shapes.values(), key=key, reverse=True)[:n]
+        ]
+
+
+query_stats = QueryStats()
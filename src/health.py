@@ -0,0 +1,186 @@
+# src/health.py
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from appconfig import Settings
+from src.stats import LATENCY_WINDOWS, bucket_index, summarize
+
+config = Settings()
+logger = logging.getLogger(__name__)
+
+# Espera pela conexão medida em _do_get, lida em connect() no mesmo greenlet
+_checkout_wait: ContextVar[float] = ContextVar("checkout_wait", default=0.0)
+
+
+class RollingHistogram:
+    """Histograma log-linear acumulado (para o /metrics) e da janela recente (para o /stats)."""
+
+    def __init__(self, slot_seconds: int = LATENCY_WINDOWS["1m"][0], slots: int = LATENCY_WINDOWS["1m"][1]):
+        self.buckets = Counter()
+        self.sum = 0.0
+        self.slot_seconds = slot_seconds
+        self._slots: deque[tuple[int, Counter]] = deque(maxlen=slots)
+
+    def add(self, seconds: float):
+        index = bucket_index(int(seconds * 1_000_000))
+        self.buckets[index] += 1
+        self.sum += seconds
+        slot = int(time.time() // self.slot_seconds)
+        if not self._slots or self._slots[-1][0] != slot:
+            self._slots.append((slot, Counter()))
+        self._slots[-1][1][index] += 1
+
+    def recent(self) -> dict:
+        """count, percentis e max (ms) da janela recente."""
+        oldest = int(time.time() // self.slot_seconds) - self._slots.maxlen + 1
+        merged = Counter()
+        for slot, buckets in self._slots:
+            if slot >= oldest:
+                merged.update(buckets)
+        return summarize(merged)
+
+
+class _Throttled:
+    """Avisos no log limitados a um por HEALTH_WARN_INTERVAL segundos para cada tipo."""
+
+    def __init__(self):
+        self._last: dict[str, float] = {}
+
+    def warning(self, kind: str, msg: str, *args):
+        now = time.monotonic()
+        if now - self._last.get(kind, -config.HEALTH_WARN_INTERVAL) >= config.HEALTH_WARN_INTERVAL:
+            self._last[kind] = now
+            logger.warning(msg, *args)
+
+
+_warnings = _Throttled()
+
+
+class PoolStats:
+    """Ocupação e tempos do pool de conexões deste worker.
+
+    Espera, pre-ping e o pico de conexões em uso são medidos no InstrumentedQueuePool;
+    aberturas e invalidações (ex.: falha no pre-ping) vêm dos eventos do pool.
+    """
+
+    def __init__(self):
+        self.checkout_wait = RollingHistogram()
+        self.pre_ping = RollingHistogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self._engine = None
+
+    def instrument(self, engine: AsyncEngine):
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "connect", self._connect)
+        event.listen(sync_engine, "invalidate", self._invalidate)
+
+    def _connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def record_checkout(self, pool, wait: float, total: float):
+        self.checkouts += 1
+        self.checkout_wait.add(wait)
+        self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+        self.peak_overflow = max(self.peak_overflow, pool.overflow())
+        if pool.checkedout() >= pool.size() + pool._max_overflow:
+            _warnings.warning("pool_saturated", "Pool de conexões esgotado: %d em uso (pool_size=%d, max_overflow=%d)",
+                              pool.checkedout(), pool.size(), pool._max_overflow)
+        if pool._pre_ping:
+            # Restante do checkout: o ping da conexão reaproveitada (e reconexão, se falhar)
+            self.pre_ping.add(max(total - wait, 0.0))
+        if wait * 1000 >= config.POOL_WAIT_WARN_MS:
+            _warnings.warning("pool_wait", "Espera de %.0f ms por conexão do pool (%d em uso, overflow %d)",
+                              wait * 1000, pool.checkedout(), pool.overflow())
+
+    def record_timeout(self, pool):
+        self.timeouts += 1
+        logger.error("Tempo esgotado aguardando conexão do pool (%d em uso, pool_timeout=%ss)",
+                     pool.checkedout(), pool._timeout)
+
+    def snapshot(self) -> dict:
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        if pool is None or not hasattr(pool, "checkedout"):
+            return {}
+        return {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "peak_checked_out": self.peak_checked_out,
+            "peak_overflow": max(self.peak_overflow, 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "wait": self.checkout_wait.recent(),
+            "pre_ping": self.pre_ping.recent(),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que mede o tempo de checkout.
+
+    A espera é o tempo em _do_get (fila do pool, incluindo abrir uma conexão de overflow);
+    o restante até a conexão ser entregue é o pre-ping.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        pool_stats.record_checkout(self, _checkout_wait.get(), time.perf_counter() - start)
+        return connection
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_timeout(self)
+            raise
+        finally:
+            _checkout_wait.set(time.perf_counter() - start)
+
+
+class LoopLagMonitor:
+    """Atraso do event loop: quanto um asyncio.sleep(interval) passa do prazo.
+
+    Um atraso alto indica código síncrono bloqueando o loop (CPU, E/S sem await), ao
+    contrário da espera no pool, que indica falta de conexões.
+    """
+
+    def __init__(self):
+        self.lag = RollingHistogram()
+        self.last = 0.0
+
+    async def run(self, interval: float):
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self.last = max(time.perf_counter() - expected, 0.0)
+            self.lag.add(self.last)
+            if self.last * 1000 >= config.LOOP_LAG_WARN_MS:
+                _warnings.warning("loop_lag", "Event loop atrasado em %.0f ms", self.last * 1000)
+
+    def snapshot(self) -> dict:
+        return {"last_ms": self.last * 1000, **self.lag.recent()}
+
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,118 @@
+# src/instrumentation.py
+import logging
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from src.dbstats import query_stats
+from src.stats import stats_recorder
+from src.timeseries import TZ_OFFSET
+from src.utils import is_admin_authorization
+from src.cache import WARMUP_SCOPE_KEY
+
+# Chave única para caminhos que não casam com nenhuma rota (ex.: 404 de URLs arbitrárias)
+UNMATCHED = "<sem rota>"
+# Server-Timing expõe a estrutura das consultas: só com este cabeçalho e credenciais de admin
+SERVER_TIMING_HEADER = "X-Server-Timing"
+_SERVER_TIMING_HEADER = SERVER_TIMING_HEADER.lower().encode("latin-1")
+# Registros JSON de acesso (log_conf.yaml), no lugar do uvicorn.access
+access_logger = logging.getLogger("api.access")
+
+
+class RequestStatsMiddleware:
+    """Contagem, tempo e latência por template de rota, e o log de acesso, em ASGI puro.
+
+    Substitui o @app.middleware("http"): sem a task extra e o encapsulamento do corpo
+    do BaseHTTPMiddleware, e com chaves limitadas ao conjunto de rotas da aplicação.
+    O cabeçalho Server-Timing (tempo de banco por etapa) só vai para requisições com
+    X-Server-Timing e credenciais de administrador.
+    """
+
+    def __init__(self, app, excluded_paths=()):
+        self.app = app
+        self.excluded_paths = frozenset(excluded_paths)
+        self._month = (None, "")
+
+    def _current_month(self) -> str:
+        # "MM/AAAA" no fuso de -3h, recalculado só quando o minuto muda
+        minute = int(time.time() // 60)
+        if self._month[0] != minute:
+            self._month = (minute, time.strftime("%m/%Y", time.gmtime(minute * 60 + TZ_OFFSET)))
+        return self._month[1]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter_ns()
+        # Caminhos administrativos não entram nas estatísticas, mas aparecem no log de acesso
+        tracked = scope["path"] not in self.excluded_paths
+        db_token = query_stats.begin_request(scope) if tracked else None
+        response = {"status": 500, "cache": None, "bytes": 0}
+        server_timing = tracked and self._wants_server_timing(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"x-cache":
+                        response["cache"] = value.decode("latin-1")
+                db_info = query_stats.current() if server_timing else None
+                # Onde o tempo foi gasto: banco por etapa e o restante (serialização, cache, Python)
+                if db_info is not None and db_info["queries"]:
+                    elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+                    timings = [f'db;dur={db_info["db_time"] * 1000:.1f};desc="{db_info["queries"]} queries"']
+                    timings += [f"db-{phase};dur={value * 1000:.1f}" for phase, value in db_info["phases"].items()]
+                    timings.append(f'app;dur={elapsed_ms - db_info["db_time"] * 1000:.1f}')
+                    MutableHeaders(scope=message).append("Server-Timing", ", ".join(timings))
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = (time.perf_counter_ns() - start) / 1_000_000_000
+            # Consultas do warm-up não são tráfego real: fora das estatísticas e do log de acesso.
+            # A marca é posta no scope pelo próprio warm-up; um cabeçalho do cliente não conta
+            warmup = scope.get(WARMUP_SCOPE_KEY, False)
+            if tracked:
+                query_stats.end_request(db_token)
+                if not warmup:
+                    self._record(scope, response["status"], elapsed)
+            if not warmup and access_logger.isEnabledFor(logging.INFO):
+                self._log_access(scope, response, elapsed)
+
+    @staticmethod
+    def _wants_server_timing(scope) -> bool:
+        if not any(name == _SERVER_TIMING_HEADER for name, _ in scope["headers"]):
+            return False
+        return is_admin_authorization(Headers(scope=scope).get("authorization"))
+
+    @staticmethod
+    def _log_access(scope, response: dict, elapsed: float):
+        route = scope.get("route")
+        client = scope.get("client")
+        access_logger.info("%s %s %d", scope["method"], scope["path"], response["status"], extra={"fields": {
+            "client": f"{client[0]}:{client[1]}" if client else None,
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "route": route.path if route is not None else None,
+            "status": response["status"],
+            "duration_ms": round(elapsed * 1000, 2),
+            "cache": response["cache"],
+            "bytes": response["bytes"],
+        }})
+
+    def _record(self, scope, status_code: int, elapsed: float):
+        route = scope.get("route")
+        if route is not None:
+            template = route.path
+            if template in self.excluded_paths:
+                return
+        elif "endpoint" in scope:
+            # Aplicações montadas (ex.: /static) e rotas internas como /openapi.json
+            return
+        else:
+            template = UNMATCHED
+        stats_recorder.record(template, elapsed, self._current_month())
+        stats_recorder.record_latency(template, status_code, elapsed)
@@ -0,0 +1,84 @@
+# src/logqueue.py
+import datetime as dt
+import logging
+import queue
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from pydoc import locate
+import orjson
+
+
+class BackgroundHandler(QueueHandler):
+    """Handler que entrega os registros a uma thread de fundo, onde o handler de destino
+    (ex.: RotatingFileHandler) formata e grava; o event loop só enfileira.
+
+    A fila é limitada: com ela cheia o registro é descartado e contado por nível, em
+    vez de bloquear a requisição. Uso em log_conf.yaml:
+
+        class: src.logqueue.BackgroundHandler
+        target: logging.handlers.RotatingFileHandler
+        filename: logs/api_app.log
+    """
+
+    instances: list["BackgroundHandler"] = []
+
+    def __init__(self, target: str, queue_size: int = 10000, **kwargs):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.target = locate(target)(**kwargs)
+        self.dropped = Counter()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        BackgroundHandler.instances.append(self)
+
+    def setFormatter(self, fmt):
+        # A formatação acontece na thread de fundo, no handler de destino
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Sem format() aqui: o QueueHandler padrão formataria a mensagem no event loop
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname] += 1
+
+    def close(self):
+        # Esvazia a fila antes de fechar o arquivo
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+
+def queue_stats() -> dict:
+    """Ocupação da fila e registros descartados por handler."""
+    return {
+        handler.name or repr(handler.target): {
+            "queued": handler.queue.qsize(),
+            "capacity": handler.queue.maxsize,
+            "dropped": dict(handler.dropped),
+        }
+        for handler in BackgroundHandler.instances
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro; os campos passados em extra={"fields": {...}} vão para a raiz."""
+
+    def format(self, record):
+        data = {
+            "ts": dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        else:
+            data["message"] = record.getMessage()
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(data, default=str).decode()
@@ -0,0 +1,138 @@
+# src/metrics.py
+import os
+from collections import Counter
+import psutil
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.cache import cache_stats, cache_budget
+from src.dbstats import query_stats
+from src.health import loop_monitor, pool_stats
+from src.logqueue import queue_stats
+from src.stats import bucket_upper_ms, stats_recorder
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (s) expostos ao Prometheus, agregados a partir dos histogramas log-linear.
+# Um bucket fino que atravessa um limite é contado no limite seguinte.
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Espera no pool e atraso do event loop: normalmente abaixo de 1 ms
+FINE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram(lines: list, name: str, labels: dict, buckets: Counter, total: float,
+               bounds: tuple = PROMETHEUS_BUCKETS):
+    cumulative, fine = 0, sorted(buckets.items())
+    position = 0
+    for le in bounds:
+        while position < len(fine) and bucket_upper_ms(fine[position][0]) / 1000 <= le:
+            cumulative += fine[position][1]
+            position += 1
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {cumulative}")
+    count = sum(buckets.values())
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {count}')
+    lines.append(f"{name}_sum{_labels(**labels)} {total}")
+    lines.append(f"{name}_count{_labels(**labels)} {count}")
+
+
+def _header(lines: list, name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+async def render_metrics(engine: AsyncEngine | None) -> str:
+    """Métricas no formato texto do Prometheus, montadas a partir dos contadores já agregados.
+
+    Requisições e latência por rota somam todos os workers (via stats_recorder) e o
+    orçamento do cache é compartilhado; as demais séries (cache, pool, consultas, event
+    loop, logs e processo) são do worker que atendeu a coleta e levam o rótulo `worker`
+    (pid), para que cada worker seja uma série própria no Prometheus.
+    """
+    worker = {"worker": os.getpid()}
+    windows, sums = await stats_recorder.histograms()
+    series = [(name.rsplit(" ", 1), buckets, sums.get(name, 0.0)) for name, buckets in windows.get("total", {}).items()]
+    lines = []
+
+    _header(lines, "api_http_requests_total", "counter", "Requisições por template de rota e classe de status.")
+    for (route, status_class), buckets, _ in series:
+        lines.append(f"api_http_requests_total{_labels(route=route, status_class=status_class)} {sum(buckets.values())}")
+
+    _header(lines, "api_http_request_duration_seconds", "histogram", "Duração das requisições por template de rota.")
+    for (route, status_class), buckets, total in series:
+        _histogram(lines, "api_http_request_duration_seconds", {"route": route, "status_class": status_class},
+                   buckets, total)
+
+    _header(lines, "api_cache_requests_total", "counter", "Consultas ao cache de respostas por endpoint e resultado.")
+    for endpoint, stats in cache_stats.items():
+        for result in ("hits", "misses", "stale"):
+            lines.append(f"api_cache_requests_total{_labels(**worker, endpoint=endpoint, result=result)} {stats[result]}")
+    _header(lines, "api_cache_refresh_errors_total", "counter", "Falhas de revalidação em segundo plano.")
+    for endpoint, stats in cache_stats.items():
+        lines.append(f"api_cache_refresh_errors_total{_labels(**worker, endpoint=endpoint)} {stats['refresh_errors']}")
+    _header(lines, "api_cache_budget_bytes", "gauge", "Uso e limite do orçamento de memória do cache.")
+    lines.append(f'api_cache_budget_bytes{_labels(kind="used")} {cache_budget.used}')
+    lines.append(f'api_cache_budget_bytes{_labels(kind="limit")} {cache_budget.limit}')
+
+    pool = engine.sync_engine.pool if engine is not None else None
+    if pool is not None and hasattr(pool, "checkedout"):
+        for name, value, help_text in (
+            ("api_db_pool_size", pool.size(), "Tamanho configurado do pool de conexões."),
+            ("api_db_pool_checked_out", pool.checkedout(), "Conexões em uso."),
+            ("api_db_pool_checked_in", pool.checkedin(), "Conexões ociosas no pool."),
+            ("api_db_pool_overflow", pool.overflow(), "Conexões além de pool_size."),
+        ):
+            _header(lines, name, "gauge", help_text)
+            lines.append(f"{name}{_labels(**worker)} {value}")
+        _header(lines, "api_db_pool_checked_out_peak", "gauge", "Maior número de conexões em uso desde o início.")
+        lines.append(f"api_db_pool_checked_out_peak{_labels(**worker)} {pool_stats.peak_checked_out}")
+        _header(lines, "api_db_pool_checkout_wait_seconds", "histogram", "Espera por uma conexão livre no pool.")
+        _histogram(lines, "api_db_pool_checkout_wait_seconds", worker, pool_stats.checkout_wait.buckets,
+                   pool_stats.checkout_wait.sum, FINE_BUCKETS)
+        _header(lines, "api_db_pool_pre_ping_seconds", "histogram", "Duração do pre-ping no checkout.")
+        _histogram(lines, "api_db_pool_pre_ping_seconds", worker, pool_stats.pre_ping.buckets,
+                   pool_stats.pre_ping.sum, FINE_BUCKETS)
+        _header(lines, "api_db_pool_timeouts_total", "counter", "Checkouts que excederam pool_timeout.")
+        lines.append(f"api_db_pool_timeouts_total{_labels(**worker)} {pool_stats.timeouts}")
+        _header(lines, "api_db_pool_connections_total", "counter", "Conexões abertas e invalidadas pelo pool.")
+        lines.append(f'api_db_pool_connections_total{_labels(**worker, event="connect")} {pool_stats.connects}')
+        lines.append(f'api_db_pool_connections_total{_labels(**worker, event="invalidate")} {pool_stats.invalidations}')
+
+    _header(lines, "api_db_query_duration_seconds", "histogram", "Duração das consultas ao banco.")
+    _histogram(lines, "api_db_query_duration_seconds", worker, query_stats.buckets, query_stats.sum)
+    _header(lines, "api_db_query_errors_total", "counter", "Consultas ao banco que terminaram em erro.")
+    lines.append(f"api_db_query_errors_total{_labels(**worker)} {query_stats.errors}")
+    _header(lines, "api_db_time_seconds_total", "counter", "Tempo de banco por template de rota e etapa da consulta.")
+    for route, stats in sorted(query_stats.routes.items()):
+        for phase, value in sorted(stats["phases"].items()):
+            lines.append(f"api_db_time_seconds_total{_labels(**worker, route=route, phase=phase)} {value}")
+
+    _header(lines, "api_event_loop_lag_seconds", "histogram", "Atraso do event loop em relação ao agendado.")
+    _histogram(lines, "api_event_loop_lag_seconds", worker, loop_monitor.lag.buckets, loop_monitor.lag.sum, FINE_BUCKETS)
+
+    logging_queues = queue_stats()
+    _header(lines, "api_log_queue_depth", "gauge", "Registros aguardando gravação na fila de log.")
+    for handler, stats in logging_queues.items():
+        lines.append(f"api_log_queue_depth{_labels(**worker, handler=handler)} {stats['queued']}")
+    _header(lines, "api_log_dropped_total", "counter", "Registros de log descartados com a fila cheia.")
+    for handler, stats in logging_queues.items():
+        for level, value in stats["dropped"].items():
+            lines.append(f"api_log_dropped_total{_labels(**worker, handler=handler, level=level)} {value}")
+
+    # O processo da coleta, mesmo que o módulo tenha sido importado antes do fork dos workers
+    process = psutil.Process()
+    cpu = process.cpu_times()
+    _header(lines, "process_resident_memory_bytes", "gauge", "Memória residente do processo.")
+    lines.append(f"process_resident_memory_bytes{_labels(**worker)} {process.memory_info().rss}")
+    _header(lines, "process_cpu_seconds_total", "counter", "Tempo de CPU (usuário + sistema) do processo.")
+    lines.append(f"process_cpu_seconds_total{_labels(**worker)} {cpu.user + cpu.system}")
+    _header(lines, "process_start_time_seconds", "gauge", "Início do processo, em segundos desde a época Unix.")
+    lines.append(f"process_start_time_seconds{_labels(**worker)} {process.create_time()}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,177 @@
+# src/profiler.py
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+import orjson
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from appconfig import Settings
+from src.utils import is_admin_authorization
+
+config = Settings()
+
+PROFILE_HEADER = "X-Profile"
+_PROFILE_HEADER = PROFILE_HEADER.lower().encode("latin-1")
+# Um perfil por vez em cada worker (endpoint ou cabeçalho)
+profile_lock = asyncio.Lock()
+
+# Folhas de pilha que indicam thread ociosa: event loop esperando E/S (com uvloop o laço é
+# código C e a folha Python é o asyncio.run), threads em espera
+_IDLE = {("selectors.py", "select"), ("runners.py", "run"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+class SamplingProfiler:
+    """Profiler por amostragem: uma thread lê sys._current_frames() a cada intervalo.
+
+    Não instrumenta chamadas, então o custo independe do código perfilado. Amostra
+    todas as threads do worker (event loop, asyncio.to_thread, logs); pilhas ociosas
+    são descartadas.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: dict[int, Counter] = defaultdict(Counter)
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.ticks = 0
+        self._frames: dict[tuple, int] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.time() - self.started_at
+
+    def _frame(self, code) -> int:
+        key = (code.co_filename, code.co_name, code.co_firstlineno)
+        index = self._frames.get(key)
+        if index is None:
+            index = self._frames[key] = len(self._frames)
+        return index
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.is_set():
+            self.ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[ident][tuple(stack)] += 1
+            self._stop.wait(self.interval)
+
+    def _thread_names(self) -> dict[int, str]:
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def speedscope(self, name: str) -> dict:
+        """Perfil no formato do speedscope (https://www.speedscope.app), uma aba por thread."""
+        # Peso real de cada amostra: o intervalo efetivo entre leituras
+        weight = self.duration / self.ticks if self.ticks else self.interval
+        names = self._thread_names()
+        frames = [{"name": func, "file": file, "line": line} for file, func, line in self._frames]
+        profiles = []
+        for ident, stacks in sorted(self.samples.items(), key=lambda item: -sum(item[1].values())):
+            weights = [count * weight for count in stacks.values()]
+            profiles.append({
+                "type": "sampled",
+                "name": names.get(ident, f"thread {ident}"),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [list(stack) for stack in stacks],
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": config.APP_NAME,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def collapsed(self) -> str:
+        """Pilhas no formato "folded" do flamegraph.pl / inferno: "a;b;c contagem"."""
+        labels = [f"{func} ({os.path.basename(file)}:{line})" for file, func, line in self._frames]
+        stacks = Counter()
+        for samples in self.samples.values():
+            for stack, count in samples.items():
+                stacks[";".join(labels[index] for index in stack)] += count
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def response(self, name: str, fmt: str = "speedscope", headers: dict | None = None) -> Response:
+        filename = f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        if fmt == "collapsed":
+            content, media_type, filename = self.collapsed(), "text/plain; charset=utf-8", f"{filename}.folded"
+        else:
+            content, media_type = orjson.dumps(self.speedscope(name)), "application/json"
+            filename = f"{filename}.speedscope.json"
+        headers = {**(headers or {}), "Content-Disposition": f'attachment; filename="{filename}"'}
+        return Response(content, media_type=media_type, headers=headers)
+
+
+async def profile_for(seconds: float, interval: float) -> SamplingProfiler:
+    """Amostra o worker durante `seconds` segundos sem bloquear o event loop."""
+    profiler = SamplingProfiler(interval)
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return profiler
+
+
+class ProfileRequestMiddleware:
+    """Com o cabeçalho X-Profile e credenciais de administrador, amostra o worker enquanto
+    a requisição é processada e devolve o perfil (speedscope, ou "collapsed" se X-Profile:
+    collapsed) no lugar da resposta. O status original vai em X-Profile-Status.
+
+    É um perfil do worker inteiro delimitado pela duração da requisição, não só dela:
+    requisições concorrentes e tarefas de fundo do mesmo worker entram nas amostras.
+    Para isolar a requisição, use-o num worker sem outro tráfego."""
+
+    def __init__(self, app, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(name == _PROFILE_HEADER for name, _ in scope["headers"]):
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not is_admin_authorization(headers.get("authorization")) or profile_lock.locked():
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def discard(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        async with profile_lock:
+            profiler = SamplingProfiler(self.interval)
+            profiler.start()
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.stop()
+        fmt = "collapsed" if headers.get(PROFILE_HEADER) == "collapsed" else "speedscope"
+        target = scope["path"] + (f"?{scope['query_string'].decode('latin-1')}" if scope["query_string"] else "")
+        response = profiler.response(f"worker {os.getpid()} durante {scope['method']} {target}", fmt,
+                                     {"X-Profile-Status": str(status_code)})
+        await response(scope, receive, send)
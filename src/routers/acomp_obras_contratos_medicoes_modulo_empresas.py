@@ -7,7 +7,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedAcompObrasContratosM
 from datetime import date
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 acomp_obras_contratos_medicoes_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada de Acompanhamento de Obras, Contratos e Medições (Módulo Empresas)",
     response_model=PaginatedAcompObrasContratosMedicoesModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_acomp_obras_contratos_medicoes_modulo_empresas(
     id_proposta: Optional[int] = Query(None, description='Identificador único da proposta', ge=1),
     id_contrato_medicao_acompanhamento_obra: Optional[int] = Query(None, description='Identificador único do contrato de medição', ge=1),
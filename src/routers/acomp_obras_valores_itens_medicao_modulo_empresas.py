@@ -6,7 +6,7 @@ from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedResponseTemplate, PaginatedAcompObrasValoresItensMedicaoModuloEmpresasResponse
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 acomp_obras_valores_itens_medicao_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -18,7 +18,7 @@ config = Settings()
     response_description="Lista Paginada dos valores dos itens de medição das obras (Módulo Empresas)",
     response_model=PaginatedAcompObrasValoresItensMedicaoModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_acomp_obras_valores_itens_medicao_modulo_empresas(
     id_submeta_vrpl: Optional[int] = Query(None, description='Identificador único da submeta', ge=1),
     id_contrato_medicao_acompanhamento_obra: Optional[int] = Query(None, description='Identificador único do contrato de medição', ge=1),
@@ -7,7 +7,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedContratoResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 contrato_router = APIRouter(tags=["Licitação/Contrato"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                     response_description="Lista Paginada de Contratos",
                     response_model=PaginatedContratoResponse
                     )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_contrato(
     id_licitacao: Optional[int] = Query(None, description='Identificador único da tabela licitação', gt=0),
     nr_contrato: Optional[int] = Query(None, description='Número do contrato, gerado sequencialmente pelo Sistema', gt=0),
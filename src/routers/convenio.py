@@ -5,9 +5,11 @@ from src import models
 from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedConvenioResponse
 from datetime import date
-from typing import Optional, Literal
+from pydantic import PositiveInt
+from typing import Optional, Literal, List
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
+from src.rowcache import pk_lookup, lookup_page
 
 convenio_router = APIRouter(tags=["Instrumento"])
 config = Settings()
@@ -19,9 +21,9 @@ config = Settings()
                       response_description="Lista Paginada de Convênios",
                       response_model=PaginatedConvenioResponse
                       )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached(bypass=pk_lookup('nr_convenio'))
 async def consulta_convenio(
-    nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
+    nr_convenio: Optional[List[PositiveInt]] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999. Pode ser repetido para consultar vários convênios.', max_length=config.MAX_IDS_PER_LOOKUP),
     id_proposta: Optional[int] = Query(None, description='ID da Proposta associada ao Convênio', gt=0),
     dia_assin_conv: Optional[str] = Query(None, description='Data de assinatura do Convênio (AAAA-MM-DD)', pattern="^[0-9]{4}-[0-9]{2}-[0-9]{2}$"),
     sit_convenio: Optional[str] = Query(None, description='Situação do Convênio'),
@@ -60,10 +62,18 @@ async def consulta_convenio(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=config.ERROR_MESSAGE_NO_PARAMS)
 
+    # Consulta apenas por nr_convenio é servida pelo cache de linhas, sem COUNT/OFFSET
+    if all([params[_name] is None for _name in params_list if _name != 'nr_convenio']):
+        try:
+            return await lookup_page(dbsession, models.Convenio, nr_convenio, pagina, tamanho_da_pagina)
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=config.ERROR_MESSAGE_INTERNAL)
+
     try:
         query = select(models.Convenio).where(
             and_(
-                models.Convenio.nr_convenio == nr_convenio if nr_convenio is not None else True,
+                models.Convenio.nr_convenio.in_(nr_convenio) if nr_convenio is not None else True,
                 models.Convenio.id_proposta == id_proposta if id_proposta is not None else True,
                 cast(models.Convenio.dia_assin_conv, Date) == date.fromisoformat(dia_assin_conv) if dia_assin_conv is not None else True,
                 models.Convenio.sit_convenio.ilike(f"%{sit_convenio}%") if sit_convenio is not None else True,
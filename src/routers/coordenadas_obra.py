@@ -1,12 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, and_
 from src import models
 from src.utils import get_session, get_paginated_data
-from src.schemas import PaginatedResponseTemplate, PaginatedCoordenadasObraResponse
+from src.schemas import PaginatedResponseTemplate, PaginatedCoordenadasObraResponse, TileCoordenadasObraResponse
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
+from src.spatial import coordenadas_index, parse_bbox
 
 coordenadas_obra_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -18,12 +19,16 @@ config = Settings()
     response_description="Lista Paginada de Coordenadas das Obras",
     response_model=PaginatedCoordenadasObraResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_coordenadas_obra(
     id_proposta: Optional[int] = Query(None, description='Código do Sistema para uma Proposta', ge=1),
     nome_projeto_cadastro_obra: Optional[str] = Query(None, description='Nome do projeto cadastrado'),
     latitude_cadastro_obra: Optional[float] = Query(None, description='Latitude do local da obra'),
     longitude_cadastro_obra: Optional[float] = Query(None, description='Longitude do local da obra'),
+    bbox: Optional[str] = Query(None, description='Retângulo de busca no formato min_lat,min_lon,max_lat,max_lon', examples=["-16.1,-48.3,-15.5,-47.3"]),
+    latitude_centro: Optional[float] = Query(None, description='Latitude do centro da busca por raio', ge=-90, le=90),
+    longitude_centro: Optional[float] = Query(None, description='Longitude do centro da busca por raio', ge=-180, le=180),
+    raio_km: Optional[float] = Query(None, description='Raio da busca em quilômetros', gt=0, le=config.MAX_RAIO_KM),
     pagina: int = Query(1, ge=1, description="Número da Página"),
     tamanho_da_pagina: int = Query(config.DEFAULT_PAGE_SIZE, le=config.MAX_PAGE_SIZE, ge=1, description="Tamanho da Página"),
     dbsession: AsyncSession = Depends(get_session)
@@ -34,6 +39,14 @@ async def consulta_coordenadas_obra(
     if all([params[_name] is None for _name in params_list]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=config.ERROR_MESSAGE_NO_PARAMS)
 
+    raio = (latitude_centro, longitude_centro, raio_km)
+    if any(v is not None for v in raio) and not all(v is not None for v in raio):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=config.ERROR_MESSAGE_RAIO)
+    try:
+        limites = parse_bbox(bbox) if bbox is not None else None
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
+
     try:
         query = select(models.CoordenadasObra).where(
             and_(
@@ -41,6 +54,8 @@ async def consulta_coordenadas_obra(
                 models.CoordenadasObra.nome_projeto_cadastro_obra.ilike(f"%{nome_projeto_cadastro_obra}%") if nome_projeto_cadastro_obra is not None else True,
                 models.CoordenadasObra.latitude_cadastro_obra == latitude_cadastro_obra if latitude_cadastro_obra is not None else True,
                 models.CoordenadasObra.longitude_cadastro_obra == longitude_cadastro_obra if longitude_cadastro_obra is not None else True,
+                coordenadas_index.bbox_clause(*limites) if limites is not None else True,
+                coordenadas_index.radius_clause(*raio) if raio_km is not None else True,
             )
         )
         result = await get_paginated_data(
@@ -52,4 +67,39 @@ async def consulta_coordenadas_obra(
         )
         return result
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=config.ERROR_MESSAGE_INTERNAL)
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=config.ERROR_MESSAGE_INTERNAL)
+
+
+@coordenadas_obra_router.get(
+    "/coordenadas-obra/tiles/{z}/{x}/{y}",
+    status_code=status.HTTP_200_OK,
+    description=f"Retorna um tile do mapa de obras (esquema XYZ/Web Mercator). Abaixo do zoom {config.TILE_POINTS_MIN_ZOOM} "
+                "traz apenas contagens agregadas por célula; a partir dele, os pontos individuais.",
+    response_description="Tile de Coordenadas das Obras",
+    response_model=TileCoordenadasObraResponse
+)
+@cached()
+async def consulta_tile_coordenadas_obra(
+    z: int = Path(..., description='Nível de zoom', ge=0, le=config.TILE_MAX_ZOOM),
+    x: int = Path(..., description='Coluna do tile', ge=0),
+    y: int = Path(..., description='Linha do tile', ge=0),
+    dbsession: AsyncSession = Depends(get_session)
+):
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=config.ERROR_MESSAGE_TILE)
+
+    try:
+        if z < config.TILE_POINTS_MIN_ZOOM:
+            clusters = coordenadas_index.clusters(z, x, y)
+            return TileCoordenadasObraResponse(
+                z=z, x=x, y=y,
+                total_items=sum(cluster["quantidade"] for cluster in clusters),
+                clusters=clusters
+            )
+
+        query = select(models.CoordenadasObra).where(coordenadas_index.tile_clause(z, x, y))
+        result = await dbsession.execute(query)
+        pontos = result.scalars().all()
+        return TileCoordenadasObraResponse(z=z, x=x, y=y, total_items=len(pontos), pontos=pontos)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=config.ERROR_MESSAGE_INTERNAL)
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedCronogramaDesembolso
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 crono_router = APIRouter(tags=["Desembolso"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Cronograma de Desembolso",
                 response_model=PaginatedCronogramaDesembolsoResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_cronograma_desembolso(
     id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Depends, status, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from src import models
+from src.utils import get_session
+from src.schemas import CronogramaFisicoResponse
+from appconfig import Settings
+from src.cache import cached
+
+cronograma_fisico_router = APIRouter(tags=["Plano de Trabalho"])
+config = Settings()
+
+
+@cronograma_fisico_router.get("/cronograma-fisico/{nr_convenio}",
+                status_code=status.HTTP_200_OK,
+                description="Retorna o Cronograma Físico de um Instrumento: suas Metas, as Etapas de cada Meta e os totais de valores.",
+                response_description="Cronograma Físico do Instrumento",
+                response_model=CronogramaFisicoResponse
+                )
+@cached()
+async def consulta_cronograma_fisico(
+    nr_convenio: int = Path(..., description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
+    dbsession: AsyncSession = Depends(get_session)
+):
+    try:
+        # Duas consultas: metas do instrumento e, em seguida, todas as etapas dessas metas
+        metas_query = select(models.MetaCronoFisico).where(
+            models.MetaCronoFisico.nr_convenio == nr_convenio
+        ).order_by(models.MetaCronoFisico.id_meta)
+        metas = (await dbsession.execute(metas_query)).scalars().all()
+
+        etapas_por_meta = {meta.id_meta: [] for meta in metas}
+        if metas:
+            etapas_query = select(models.EtapaCronoFisico).where(
+                models.EtapaCronoFisico.id_meta.in_(etapas_por_meta.keys())
+            ).order_by(models.EtapaCronoFisico.id_meta, models.EtapaCronoFisico.nr_etapa)
+            for etapa in (await dbsession.execute(etapas_query)).scalars():
+                etapas_por_meta[etapa.id_meta].append(etapa.model_dump())
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=config.ERROR_MESSAGE_INTERNAL)
+
+    if not metas:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=config.ERROR_MESSAGE_NOT_FOUND)
+
+    data = []
+    for meta in metas:
+        etapas = etapas_por_meta[meta.id_meta]
+        data.append({
+            **meta.model_dump(),
+            "qtd_etapas": len(etapas),
+            "vl_total_etapas": sum(etapa["vl_etapa"] or 0 for etapa in etapas),
+            "etapas": etapas,
+        })
+
+    return CronogramaFisicoResponse(
+        nr_convenio=nr_convenio,
+        qtd_metas=len(data),
+        vl_total_metas=sum(meta["vl_meta"] or 0 for meta in data),
+        vl_total_etapas=sum(meta["vl_total_etapas"] for meta in data),
+        metas=data
+    )
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedDesbloqueioCrRespons
 from datetime import date, datetime
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 desbloqueio_cr_router = APIRouter(tags=["Desembolso"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Desbloqueios de CR",
                 response_model=PaginatedDesbloqueioCrResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_desbloqueio_cr(
     nr_convenio: Optional[int] = Query(None, description='Número do Convênio'),
     nr_ob: Optional[str] = Query(None, description='Número da OB'),
@@ -7,7 +7,7 @@ from src.schemas import PaginatedDesembolsoResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 desembolso_router = APIRouter(tags=["Desembolso"]) # Tagging as Financeiro
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                         response_description="Lista Paginada de Desembolsos",
                         response_model=PaginatedDesembolsoResponse
                         )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_desembolso(
     id_desembolso: Optional[int] = Query(None, description='Identificador único gerado pelo Sistema para o Desembolso', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedEmendaResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 emenda_router = APIRouter(tags=["Emenda"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Emendas Parlamentares",
                 response_model=PaginatedEmendaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_emenda(
     id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta'),
     qualif_proponente: Optional[str] = Query(None, description='Qualificação do proponente'),
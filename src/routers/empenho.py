@@ -1,26 +1,31 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlmodel import select, and_, cast, Date
+from sqlmodel import select, and_, cast, Date, func
 from src import models
 from src.utils import get_session, get_paginated_data
-from src.schemas import PaginatedEmpenhoResponse 
+from src.schemas import PaginatedResponseTemplate, PaginatedEmpenhoResponse
 from datetime import date
-from typing import Optional
+from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 empenho_router = APIRouter(tags=["Empenho"])
 config = Settings()
 
+# Parâmetros que não filtram a consulta e não contam para ERROR_MESSAGE_NO_PARAMS
+_NON_FILTER_PARAMS = {"desembolsos", "pagina", "tamanho_da_pagina", "dbsession"}
+
 
 @empenho_router.get("/empenho", # Changed endpoint path
                     status_code=status.HTTP_200_OK,
-                    description="Retorna uma Lista Paginada dos dados de Empenho.", 
+                    description="Retorna uma Lista Paginada dos dados de Empenho. Por padrão (desembolsos=resumo) "
+                                "cada empenho traz qtd_desembolsos e valor_total_desembolsos e o campo desembolsos "
+                                "vem nulo; use desembolsos=completo para receber a lista de desembolsos, como antes.",
                     response_description="Lista Paginada de Empenhos", 
                     response_model=PaginatedEmpenhoResponse 
                     )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_empenho( # Changed function name
     id_empenho: Optional[int] = Query(None, description='Identificador único gerado pelo Sistema para o Empenho', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
@@ -37,21 +42,23 @@ async def consulta_empenho( # Changed function name
     plano_interno: Optional[str] = Query(None, description='Plano Interno'),
     ptres: Optional[str] = Query(None, description='Programa de Trabalho Resumido'),
     valor_empenho: Optional[float] = Query(None, description='Valor empenhado', gt=0),
+    desembolsos: Literal['resumo', 'completo', 'nenhum'] = Query('resumo', description="Desembolsos vinculados ao Empenho: 'resumo' traz quantidade e valor total, 'completo' lista cada desembolso e 'nenhum' os omite"),
     pagina: int = Query(1, ge=1, description="Número da Página"),
     tamanho_da_pagina: int = Query(config.DEFAULT_PAGE_SIZE, le=config.MAX_PAGE_SIZE, ge=1, description="Tamanho da Página"),
     dbsession: AsyncSession = Depends(get_session)
 ):
     params = locals().copy()
-    params_list = list(params.keys())[:-3]  # Exclude pagination and dbsession
+    params_list = [_name for _name in params if _name not in _NON_FILTER_PARAMS]
 
     if all([params[_name] is None for _name in params_list]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=config.ERROR_MESSAGE_NO_PARAMS)
 
     try:
-        query = select(models.Empenho).options(
-            selectinload(models.Empenho.desembolsos)
-        ).where( 
+        query = select(models.Empenho)
+        if desembolsos == 'completo':
+            query = query.options(selectinload(models.Empenho.desembolsos))
+        query = query.where(
             and_(
                 models.Empenho.id_empenho == id_empenho if id_empenho is not None else True,
                 models.Empenho.nr_convenio == nr_convenio if nr_convenio is not None else True,
@@ -73,9 +80,31 @@ async def consulta_empenho( # Changed function name
         
         result = await get_paginated_data(query=query,
                                           dbsession=dbsession,
-                                          response_schema=PaginatedEmpenhoResponse,
+                                          response_schema=PaginatedEmpenhoResponse if desembolsos == 'completo' else PaginatedResponseTemplate,
                                           current_page=pagina,
                                           records_per_page=tamanho_da_pagina)
+        if desembolsos == 'completo':
+            return result
+
+        # Sem carregar empenho_desembolso no ORM: contagem e soma por empenho numa única consulta agrupada
+        resumo = {}
+        if desembolsos == 'resumo' and result.data:
+            resumo_query = select(
+                models.EmpenhoDesembolso.id_empenho,
+                func.count(),
+                func.coalesce(func.sum(models.EmpenhoDesembolso.valor_grupo), 0)
+            ).where(
+                models.EmpenhoDesembolso.id_empenho.in_({item.id_empenho for item in result.data})
+            ).group_by(models.EmpenhoDesembolso.id_empenho)
+            resumo = {row[0]: row[1:] for row in await dbsession.execute(resumo_query)}
+
+        data = []
+        for item in result.data:
+            registro = item.model_dump()
+            if desembolsos == 'resumo':
+                registro["qtd_desembolsos"], registro["valor_total_desembolsos"] = resumo.get(item.id_empenho, (0, 0))
+            data.append(registro)
+        result.data = data
         return result
 
     # except ValueError as ve: # Catch potential date parsing errors
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedEtapaCronoFisicoResp
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 etapa_crono_fisico_router = APIRouter(tags=["Plano de Trabalho"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Etapas do Cronograma Físico",
                 response_model=PaginatedEtapaCronoFisicoResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_etapa_crono_fisico(
     id_etapa: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Etapa', gt=0),
     id_meta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Meta', gt=0),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedHistoricoProjetoBasi
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 historico_projeto_basico_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Histórico de Projeto Básico",
                 response_model=PaginatedHistoricoProjetoBasicoResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_historico_projeto_basico(
     id_proposta: Optional[int] = Query(None, description='Código da Proposta'),
     data_hist_pb_tr: Optional[str] = Query(None, description='Data de registro (AAAA-MM-DD)', pattern="^[0-9]{4}-[0-9]{2}-[0-9]{2}$"),
@@ -7,7 +7,7 @@ from src.schemas import PaginatedHistoricoSituacaoResponse
 from datetime import date
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 historico_situacao_router = APIRouter(tags=["Instrumento"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                              response_description="Lista Paginada do Histórico de Situações",
                              response_model=PaginatedHistoricoSituacaoResponse
                              )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_historico_situacao(
     id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedIngressoContrapartid
 from datetime import date
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 ingresso_contrapartida_router = APIRouter(tags=["Desembolso"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Ingressos de Contrapartida",
                 response_model=PaginatedIngressoContrapartidaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_ingresso_contrapartida(
     nr_convenio: Optional[int] = Query(None, description='Número do Convênio'),
     dt_ingresso_contrapartida: Optional[date] = Query(None, description='Data da disponibilização do recurso por parte do Convenente'),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedInstContMetasSubmeta
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 inst_cont_metas_submetas_po_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
     response_description="Lista Paginada de Metas, Submetas e POs do Módulo Empresas",
     response_model=PaginatedInstContMetasSubmetasPoModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_inst_cont_metas_submetas_po_modulo_empresas(
     id_meta_instrumento_contratual: Optional[int] = Query(None, description='Identificador único da meta do instrumento contratual', ge=1),
     id_submeta_instrumento_contratual: Optional[int] = Query(None, description='Identificador único da submeta do instrumento contratual', ge=1),
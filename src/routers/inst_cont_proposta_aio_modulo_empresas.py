@@ -7,7 +7,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedInstContPropostaAioM
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 inst_cont_proposta_aio_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada das Propostas AIO dos Instrumentos Contratuais (Módulo Empresas)",
     response_model=PaginatedInstContPropostaAioModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_inst_cont_proposta_aio_modulo_empresas(
     id_proposta_instrumento_contratual: Optional[int] = Query(None, description='Identificador único da proposta do instrumento contratual', ge=1),
     id_proposta: Optional[int] = Query(None, description='Identificador único da proposta', ge=1),
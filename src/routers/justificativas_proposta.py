@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedJustificativasPropos
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 jus_prop_router = APIRouter(tags=["Proposta"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Justificativas das Propostas",
                 response_model=PaginatedJustificativasPropostaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_justificativas_proposta(
     id_proposta: Optional[int] = Query(None, description='Identificador único da Proposta'),
     caracterizacao_interesses_reci: Optional[str] = Query(None, description='CCaracterização dos interesses recíprocos da proposta'),
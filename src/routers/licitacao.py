@@ -7,7 +7,7 @@ from src.schemas import PaginatedLicitacaoResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 licitacao_router = APIRouter(tags=["Licitação/Contrato"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                     response_description="Lista Paginada de Licitações",
                     response_model=PaginatedLicitacaoResponse
                     )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_licitacao(
     id_licitacao: Optional[int] = Query(None, description='Identificador único da licitação', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
@@ -6,7 +6,7 @@ from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedObtvConvenenteResponse
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 obtv_convenente_router = APIRouter(tags=["Movimentação Financeira"])
 config = Settings()
@@ -18,7 +18,7 @@ config = Settings()
                            response_description="Lista Paginada de OBTVs do Convenente",
                            response_model=PaginatedObtvConvenenteResponse
                            )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_obtv_convenente(
     nr_mov_fin: Optional[int] = Query(None, description='Número identificador da movimentação financeira', gt=0),
     identif_favorecido_obtv_conv: Optional[str] = Query(None, description='CNPJ/CPF do Favorecido recebedor do pagamento'),
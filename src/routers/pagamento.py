@@ -7,7 +7,7 @@ from src.schemas import PaginatedPagamentoResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 pagamento_router = APIRouter(tags=["Movimentação Financeira"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                       response_description="Lista Paginada de Pagamentos",
                       response_model=PaginatedPagamentoResponse
                       )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_pagamento(
     nr_mov_fin: Optional[int] = Query(None, description='Número identificador da movimentação financeira', gt=0),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
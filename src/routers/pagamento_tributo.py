@@ -7,7 +7,7 @@ from src.schemas import PaginatedPagamentoTributoResponse
 from datetime import date
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 pagamento_tributo_router = APIRouter(tags=["Movimentação Financeira"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                             response_description="Lista Paginada de Pagamentos de Tributos",
                             response_model=PaginatedPagamentoTributoResponse
                             )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_pagamento_tributo(
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
     data_tributo: Optional[str] = Query(None, description='Data da realização do pagamento do tributo (AAAA-MM-DD)', pattern="^[0-9]{4}-[0-9]{2}-[0-9]{2}$"),
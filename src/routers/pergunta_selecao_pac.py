@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedPerguntaSelecaoPacRe
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 persp_router = APIRouter(tags=["PAC"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Perguntas Selecionadas do PAC",
                 response_model=PaginatedPerguntaSelecaoPacResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_pergunta_selecao_pac(
     id_pergunta_selecao_pac: Optional[int] = Query(None, description='Identificador único da pergunta do programa Novo PAC', gt=0),
     id_programa: Optional[int] = Query(None, description='Código Sequencial do Sistema para um Programa', gt=0),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedPlanoAplicacaoDetalh
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 plapdet_router = APIRouter(tags=["Plano de Trabalho"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Planos de Aplicação Detalhado",
                 response_model=PaginatedPlanoAplicacaoDetalhadoResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_plano_aplicacao_detalhado(
     id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta'),
     sigla: Optional[Literal['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']] = Query(None, description='UF cadastrada referente a localidade do item'),
@@ -1,26 +1,33 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlmodel import select, and_, cast, Date
+from sqlmodel import select, and_, cast, Date, func
 from src import models
 from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedResponseTemplate, PaginatedProgramaResponse
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 pg_router = APIRouter(tags=["Programa"])
 config = Settings()
 
+# Parâmetros que não filtram a consulta e não contam para ERROR_MESSAGE_NO_PARAMS
+_NON_FILTER_PARAMS = {"incluir_proponentes", "incluir_propostas", "limite_relacionados",
+                      "pagina", "tamanho_da_pagina", "dbsession"}
+
 
 @pg_router.get("/programa",
                 status_code=status.HTTP_200_OK,
-                description="Retorna uma Lista Paginada dos dados dos Programas - Discricionárias e Legais.",
+                description="Retorna uma Lista Paginada dos dados dos Programas - Discricionárias e Legais. "
+                            "Por padrão cada Programa traz só qtd_proponentes e qtd_propostas, e os campos proponentes "
+                            "e propostas vêm nulos; use incluir_proponentes=completo e incluir_propostas=completo para "
+                            "receber as listas, como antes. As listas têm no máximo limite_relacionados itens, mesmo com "
+                            "completo; proponentes_truncados/propostas_truncadas indicam quando há mais vínculos que os listados.",
                 response_description="Lista Paginada de Programas - Discricionárias e Legais",
                 response_model=PaginatedProgramaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_programa(
     id_programa: Optional[int] = Query(None, description="Código Sequencial do Sistema para um Programa"),
     cod_orgao_sup_programa: Optional[str] = Query(None, description="Código do Órgão executor do Programa"),
@@ -42,22 +49,22 @@ async def consulta_programa(
     acao_orcamentaria: Optional[str] = Query(None, description="Número da Ação Orçamentária"),
     nome_subtipo_programa: Optional[str] = Query(None, description="Nome do subtipo de instrumento"),
     descricao_subtipo_programa: Optional[str] = Query(None, description="Descrição do subtipo do instrumento"),
+    incluir_proponentes: Literal['contagem', 'ids', 'completo'] = Query('contagem', description="Proponentes vinculados: apenas a quantidade, a quantidade e os ids, ou os registros completos"),
+    incluir_propostas: Literal['contagem', 'ids', 'completo'] = Query('contagem', description="Propostas vinculadas: apenas a quantidade, a quantidade e os ids, ou os registros completos"),
+    limite_relacionados: int = Query(config.DEFAULT_PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE, description="Máximo de proponentes/propostas listados por Programa, também com 'completo'. A lista é cortada quando qtd_proponentes/qtd_propostas é maior"),
     pagina: int = Query(1, ge=1, description="Número da Página"),
     tamanho_da_pagina: int = Query(config.DEFAULT_PAGE_SIZE, le=config.MAX_PAGE_SIZE, ge=1, description="Tamanho da Página"),
     dbsession: AsyncSession = Depends(get_session)
 ):
     params = locals().copy()
-    params_list = list(params.keys())[:-3]    
+    params_list = [_name for _name in params if _name not in _NON_FILTER_PARAMS]
     
     if all([params[_name] is None for _name in params_list]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=config.ERROR_MESSAGE_NO_PARAMS)
     
     try:
-        query = select(models.Programa).options(
-            selectinload(models.Programa.proponentes),
-            selectinload(models.Programa.propostas)
-        ).where(
+        query = select(models.Programa).where(
             and_(
                 models.Programa.id_programa == id_programa if id_programa is not None else True,
                 models.Programa.cod_orgao_sup_programa == cod_orgao_sup_programa if cod_orgao_sup_programa is not None else True,
@@ -86,8 +93,63 @@ async def consulta_programa(
                                           response_schema=PaginatedResponseTemplate, 
                                           current_page=pagina, 
                                           records_per_page=tamanho_da_pagina)
+
+        ids = {item.id_programa for item in result.data}
+        proponentes = await _relacionados(dbsession, models.ProgramaProponentes.id_proponente, models.Proponente,
+                                          ids, incluir_proponentes, limite_relacionados)
+        propostas = await _relacionados(dbsession, models.ProgramaProposta.id_proposta, models.Proposta,
+                                        ids, incluir_propostas, limite_relacionados)
+
+        data = []
+        for item in result.data:
+            registro = item.model_dump()
+            registro["qtd_proponentes"] = proponentes[0].get(item.id_programa, 0)
+            registro["qtd_propostas"] = propostas[0].get(item.id_programa, 0)
+            if incluir_proponentes != 'contagem':
+                registro["proponentes"] = proponentes[1].get(item.id_programa, [])
+                registro["proponentes_truncados"] = registro["qtd_proponentes"] > limite_relacionados
+            if incluir_propostas != 'contagem':
+                registro["propostas"] = propostas[1].get(item.id_programa, [])
+                registro["propostas_truncadas"] = registro["qtd_propostas"] > limite_relacionados
+            data.append(registro)
+        result.data = data
         return result
     
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail=e.__repr__())
\ No newline at end of file
+                            detail=e.__repr__())
+
+
+async def _relacionados(dbsession: AsyncSession, link_column, target_model, ids: set, modo: str, limite: int):
+    """Contagem por Programa (consulta agrupada na tabela de vínculo) e, conforme o modo,
+    até `limite` registros vinculados por Programa, sem carregar as coleções inteiras no ORM."""
+    link = link_column.class_
+    if not ids:
+        return {}, {}
+
+    count_query = select(link.id_programa, func.count()).where(
+        link.id_programa.in_(ids)
+    ).group_by(link.id_programa)
+    contagens = {row[0]: row[1] for row in await dbsession.execute(count_query)}
+    if modo == 'contagem':
+        return contagens, {}
+
+    ranked = select(
+        link.id_programa,
+        link_column.label("id_relacionado"),
+        func.row_number().over(partition_by=link.id_programa, order_by=link_column).label("posicao")
+    ).where(link.id_programa.in_(ids)).subquery()
+
+    listas = {}
+    if modo == 'ids':
+        query = select(ranked.c.id_programa, ranked.c.id_relacionado).where(ranked.c.posicao <= limite)
+        for id_programa, id_relacionado in await dbsession.execute(query):
+            listas.setdefault(id_programa, []).append({link_column.key: id_relacionado})
+    else:
+        target_pk = getattr(target_model, link_column.key)
+        query = select(ranked.c.id_programa, target_model).join(
+            target_model, target_pk == ranked.c.id_relacionado
+        ).where(ranked.c.posicao <= limite).order_by(ranked.c.id_programa, ranked.c.posicao)
+        for id_programa, registro in await dbsession.execute(query):
+            listas.setdefault(id_programa, []).append(registro.model_dump())
+    return contagens, listas
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedProjetoBasicoAcffoMo
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 projeto_basico_acffo_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
     response_description="Lista Paginada de Projetos Básicos ACFFO",
     response_model=PaginatedProjetoBasicoAcffoModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_projeto_basico_acffo_modulo_empresas(
     id_acffo: Optional[int] = Query(None, description='Identificador único do acffo', ge=1),
     id_proposta: Optional[int] = Query(None, description='Identificador único da proposta', ge=1),
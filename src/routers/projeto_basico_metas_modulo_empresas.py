@@ -7,7 +7,7 @@ from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedResponseTemplate, PaginatedProjetoBasicoMetasModuloEmpresasResponse
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 projeto_basico_metas_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada de Metas do Projeto Básico",
     response_model=PaginatedProjetoBasicoMetasModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_projeto_basico_metas_modulo_empresas(
     id_meta_projeto_basico: Optional[int] = Query(None, description='Identificador único da meta - accfo', ge=1),
     id_qci_acffo: Optional[int] = Query(None, description='Identificador único do qci - accfo', ge=1),
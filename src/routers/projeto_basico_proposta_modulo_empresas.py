@@ -6,7 +6,7 @@ from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedProjetoBasicoPropostaModuloEmpresasResponse, PaginatedResponseTemplate
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 projeto_basico_proposta_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -18,7 +18,7 @@ config = Settings()
     response_description="Lista Paginada de Propostas do Projeto Básico",
     response_model=PaginatedProjetoBasicoPropostaModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_projeto_basico_proposta_modulo_empresas(
     id_proposta_acffo: Optional[int] = Query(None, description='Identificador único do acffo da proposta', ge=1),
     id_proposta: Optional[int] = Query(None, description='Identificador único da proposta', ge=1),
@@ -7,7 +7,7 @@ from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedProjetoBasicoSubmetasModuloEmpresasResponse, PaginatedResponseTemplate
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 projeto_basico_submetas_modulo_empresas_router = APIRouter(tags=["Módulo Empresas"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada de Submetas do Projeto Básico",
     response_model=PaginatedProjetoBasicoSubmetasModuloEmpresasResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_projeto_basico_submetas_modulo_empresas(
     id_submeta_projeto_basico: Optional[int] = Query(None, description='Identificador único da submeta do projeto básico', ge=1),
     id_meta_projeto_basico: Optional[int] = Query(None, description='Identificador único da meta do projeto básico', ge=1),
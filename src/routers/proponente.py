@@ -6,9 +6,10 @@ from src import models
 from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedResponseTemplate, PaginatedProponenteResponse
 from datetime import date
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
+from src.rowcache import pk_lookup, lookup_page
 
 prop_router = APIRouter(tags=["Proponente"])
 config = Settings()
@@ -20,9 +21,9 @@ config = Settings()
                 response_description="Lista Paginada de Proponentes",
                 response_model=PaginatedProponenteResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached(bypass=pk_lookup('id_proponente'))
 async def consulta_proponente(
-    id_proponente: Optional[int] = Query(None, description='Identificador único do proponente'),
+    id_proponente: Optional[List[int]] = Query(None, description='Identificador único do proponente. Pode ser repetido para consultar vários ids.', max_length=config.MAX_IDS_PER_LOOKUP),
     identif_proponente: Optional[str] = Query(None, description='CNPJ do Proponente'),
     nm_proponente: Optional[str] = Query(None, description='Nome da Entidade Proponente'),
     municipio_proponente: Optional[str] = Query(None, description='Município do Proponente'),
@@ -43,11 +44,19 @@ async def consulta_proponente(
     if all([params[_name] is None for _name in params_list]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=config.ERROR_MESSAGE_NO_PARAMS)
+
+    # Consulta apenas por id_proponente é servida pelo cache de linhas, sem COUNT/OFFSET
+    if all([params[_name] is None for _name in params_list if _name != 'id_proponente']):
+        try:
+            return await lookup_page(dbsession, models.Proponente, id_proponente, pagina, tamanho_da_pagina)
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=config.ERROR_MESSAGE_INTERNAL)
     
     try:
         query = select(models.Proponente).where(
             and_(
-                models.Proponente.id_proponente == id_proponente if id_proponente is not None else True,
+                models.Proponente.id_proponente.in_(id_proponente) if id_proponente is not None else True,
                 models.Proponente.identif_proponente == identif_proponente if identif_proponente is not None else True,
                 models.Proponente.nm_proponente.ilike(f"%{nm_proponente}%") if nm_proponente is not None else True,
                 models.Proponente.municipio_proponente.ilike(f"%{municipio_proponente}%") if municipio_proponente is not None else True,
@@ -6,9 +6,10 @@ from src import models
 from src.utils import get_session, get_paginated_data
 from src.schemas import PaginatedResponseTemplate, PaginatedPropostaResponse
 from datetime import date
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
+from src.rowcache import pk_lookup, lookup_page
 
 prtas_router = APIRouter(tags=["Proposta"])
 config = Settings()
@@ -20,9 +21,9 @@ config = Settings()
                 response_description="Lista Paginada de Propostas",
                 response_model=PaginatedPropostaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached(bypass=pk_lookup('id_proposta'))
 async def consulta_proposta(
-    id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta'),
+    id_proposta: Optional[List[int]] = Query(None, description='Código Sequencial do Sistema para uma Proposta. Pode ser repetido para consultar vários ids.', max_length=config.MAX_IDS_PER_LOOKUP),
     id_proponente: Optional[int] = Query(None, description='Identificador único do proponente'),
     uf_proponente: Optional[Literal['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']] = Query(None, description='UF do Proponente.'),
     munic_proponente: Optional[str] = Query(None, description='Município do Proponente'),
@@ -69,11 +70,19 @@ async def consulta_proposta(
     if all([params[_name] is None for _name in params_list]):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail=config.ERROR_MESSAGE_NO_PARAMS)
+
+    # Consulta apenas por id_proposta é servida pelo cache de linhas, sem COUNT/OFFSET
+    if all([params[_name] is None for _name in params_list if _name != 'id_proposta']):
+        try:
+            return await lookup_page(dbsession, models.Proposta, id_proposta, pagina, tamanho_da_pagina)
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=config.ERROR_MESSAGE_INTERNAL)
     
     try:
         query = select(models.Proposta).where(
             and_(
-                models.Proposta.id_proposta == id_proposta if id_proposta is not None else True,
+                models.Proposta.id_proposta.in_(id_proposta) if id_proposta is not None else True,
                 models.Proposta.id_proponente == id_proponente if id_proponente is not None else True,
                 models.Proposta.uf_proponente == uf_proponente if uf_proponente is not None else True,
                 models.Proposta.munic_proponente.ilike(f"%{munic_proponente}%") if munic_proponente is not None else True,
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedPropostaCanceladaRes
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 prop_cancel_router = APIRouter(tags=["Proposta"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Propostas Canceladas",
                 response_model=PaginatedPropostaCanceladaResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_propostas_canceladas(
     id_proposta: Optional[int] = Query(None, description='Código Sequencial do Sistema para uma Proposta'),
     uf_proponente: Optional[Literal['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']] = Query(None, description='Unidade Federativa do Proponente'),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedPropostaFormalizacao
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 prpfpac_router = APIRouter(tags=["PAC"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Propostas de Formalização do PAC",
                 response_model=PaginatedPropostaFormalizacaoPacResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_proposta_formalizacao_pac(
     id_proposta_selecao_pac: Optional[int] = Query(None, description='Identificador único da Proposta do Novo PAC', gt=0),
     id_proposta: Optional[int] = Query(None, description='Identificador único da proposta', gt=0),
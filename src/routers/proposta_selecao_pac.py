@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedPropostaSelecaoPacRe
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 psp_router = APIRouter(tags=["PAC"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Propostas Selecionadas do PAC",
                 response_model=PaginatedPropostaSelecaoPacResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_proposta_selecao_pac(
     id_proposta_selecao_pac: Optional[int] = Query(None, description='Identificador único da Proposta do Novo PAC', gt=0),
     id_programa: Optional[int] = Query(None, description='Código Sequencial do Sistema para um Programa', gt=0),
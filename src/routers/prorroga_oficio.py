@@ -7,7 +7,7 @@ from src.schemas import PaginatedProrrogaOficioResponse, PaginatedResponseTempla
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 prorroga_oficio_router = APIRouter(tags=["Instrumento"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada de Prorrogações de Ofício",
     response_model=PaginatedProrrogaOficioResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_prorroga_oficio(
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
     nr_prorroga: Optional[str] = Query(None, description='Número do Prorroga de Ofício'),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedRespostaSelecaoPacRe
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 ressp_router = APIRouter(tags=["PAC"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Respostas Selecionadas do PAC",
                 response_model=PaginatedRespostaSelecaoPacResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_resposta_selecao_pac(
     id_pergunta_selecao_pac: Optional[int] = Query(None, description='Identificador único da pergunta do programa Novo PAC'),
     id_proposta_selecao_pac: Optional[int] = Query(None, description='Identificador único da Proposta do Novo PAC'),
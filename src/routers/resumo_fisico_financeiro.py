@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedResumoFisicoFinancei
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 resumo_fisico_financeiro_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Resumo Físico e Financeiro",
                 response_model=PaginatedResumoFisicoFinanceiroResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_resumo_fisico_financeiro(
     id_proposta: Optional[int] = Query(None, description='Código da Proposta'),
     valor_total_resumo_fisico_financeiro: Optional[float] = Query(None, description='Valor Total do Resumo Físico e Financeiro', ge=0),
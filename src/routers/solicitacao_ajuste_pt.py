@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedSolicitacaoAjustePtR
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 solicitacao_ajuste_pt_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
                 response_description="Lista Paginada de Solicitações de Ajuste do Plano de Trabalho",
                 response_model=PaginatedSolicitacaoAjustePtResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_solicitacao_ajuste_pt(
     id_ajuste_pt: Optional[int] = Query(None, description='Identificador único do ajuste do plano de trabalho', ge=1),
     id_proposta: Optional[int] = Query(None, description='Identificador da proposta associada ao ajuste', ge=1),
@@ -8,7 +8,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedSolicitacaoAlteracao
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 solicitacao_alteracao_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -20,7 +20,7 @@ config = Settings()
     response_description="Lista Paginada de Solicitações de Alteração",
     response_model=PaginatedSolicitacaoAlteracaoResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_solicitacao_alteracao(
     id_solicitacao: Optional[int] = Query(None, description='Identificador único da tabela solicitacao_alteracao', ge=1),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Faixa reservada: 700000 a 999999', ge=1),
@@ -7,7 +7,7 @@ from src.schemas import PaginatedResponseTemplate, PaginatedSolicitacaoRendiment
 from datetime import date
 from typing import Optional, Literal
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 solicitacao_rendimento_aplicacao_router = APIRouter(tags=["Outros"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
     response_description="Lista Paginada de Solicitações de Uso de Rendimento de Aplicação",
     response_model=PaginatedSolicitacaoRendimentoAplicacaoResponse
 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_solicitacao_rendimento_aplicacao(
     id_solicitacao_rend_aplicacao: Optional[int] = Query(None, description='Identificador único do registro de solicitação de uso de rendimento de aplicação.', ge=1),
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Faixa reservada: 700000 a 999999', ge=1),
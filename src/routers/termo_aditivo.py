@@ -7,7 +7,7 @@ from src.schemas import PaginatedTermoAditivoResponse, PaginatedResponseTemplate
 from datetime import date
 from typing import Optional
 from appconfig import Settings
-from src.cache import cache
+from src.cache import cached
 
 termo_aditivo_router = APIRouter(tags=["Instrumento"])
 config = Settings()
@@ -19,7 +19,7 @@ config = Settings()
                 response_description="Lista Paginada de Termos Aditivos",
                 response_model=PaginatedTermoAditivoResponse
                 )
-@cache(ttl=config.CACHE_TTL, lock=True)
+@cached()
 async def consulta_termo_aditivo(
     nr_convenio: Optional[int] = Query(None, description='Número gerado pelo Siconv. Possui faixa de numeração reservada que vai de 700000 a 999999', gt=0),
     id_solicitacao: Optional[int] = Query(None, description='Identificador único da solicitação de alteração', gt=0),
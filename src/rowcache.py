@@ -0,0 +1,131 @@
+# src/rowcache.py
+import asyncio
+import logging
+from math import ceil
+from cashews import cache
+from cashews.ttl import ttl_to_seconds
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from appconfig import Settings
+from src import models
+from src.bloom import existence_index
+from src.cache import cache_budget, cache_stats, decode_value, encode_value
+from src.dataset import dataset
+from src.schemas import PaginatedResponseTemplate
+
+config = Settings()
+logger = logging.getLogger(__name__)
+
+PAGINATION_PARAMS = ("pagina", "tamanho_da_pagina")
+
+# Entidades consultadas por id com frequência e a coluna que identifica cada linha
+ENTITIES = {
+    models.Proposta: "id_proposta",
+    models.Convenio: "nr_convenio",
+    models.Proponente: "id_proponente",
+}
+
+def _row_key(model, pk) -> str:
+    return f"api:row:{model.__tablename__}:{dataset.version}:{pk}"
+
+
+def pk_lookup(pk_param: str):
+    """Predicado para @cached(bypass=...): a consulta filtra apenas pela chave primária,
+    que já é servida pelo cache de linhas."""
+    def predicate(filters: dict) -> bool:
+        return filters.get(pk_param) is not None and all(
+            value is None for name, value in filters.items()
+            if name != pk_param and name not in PAGINATION_PARAMS
+        )
+    return predicate
+
+
+def _encode_rows(rows: dict) -> tuple[dict, int]:
+    encoded = {key: encode_value(row) for key, row in rows.items()}
+    return {key: payload for key, (payload, _) in encoded.items()}, sum(size for _, size in encoded.values())
+
+
+def _decode_rows(payloads: dict) -> dict:
+    rows = {}
+    for pk, payload in payloads.items():
+        try:
+            rows[pk] = decode_value(payload)
+        except Exception:
+            # Formato antigo ou corrompido: a linha é buscada de novo no banco
+            continue
+    return rows
+
+
+async def store_rows(items: list):
+    """Grava no cache de linhas os registros de uma página montada por outra consulta.
+
+    Passa pela mesma codificação e pelo mesmo orçamento de memória (cache_budget) das
+    respostas em cache; sem espaço no orçamento, as linhas não são gravadas.
+    """
+    if not items or type(items[0]) not in ENTITIES:
+        return
+    model = type(items[0])
+    pk_column = ENTITIES[model]
+    stats = cache_stats[f"row:{model.__tablename__}"]
+    rows = {_row_key(model, getattr(item, pk_column)): item.model_dump() for item in items}
+    expire = ttl_to_seconds(config.CACHE_TTL)
+    try:
+        payloads, raw_size = await asyncio.to_thread(_encode_rows, rows)
+        if not await cache_budget.reserve_many({key: len(payload) for key, payload in payloads.items()}, expire):
+            stats["not_cached"] += len(payloads)
+            return
+        await cache.set_many(payloads, expire=expire)
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += sum(len(payload) for payload in payloads.values())
+    except Exception as e:
+        logger.warning(f"Falha ao gravar cache de linhas de {model.__tablename__}: {e!r}")
+
+
+async def get_rows(dbsession: AsyncSession, model, ids: list[int]) -> list:
+    """Busca os registros pelos ids, indo ao banco apenas pelos que faltam no cache.
+    Ids inexistentes são omitidos e a ordem pedida é mantida."""
+    ids = list(dict.fromkeys(ids))
+    # Contabilizado junto aos endpoints no /stats, como "row:<tabela>"
+    stats = cache_stats[f"row:{model.__tablename__}"]
+    cached_rows = await cache.get_many(*(_row_key(model, pk) for pk in ids))
+    payloads = {pk: payload for pk, payload in zip(ids, cached_rows) if payload is not None}
+    if sum(len(payload) for payload in payloads.values()) > config.CACHE_COMPRESSION_MIN_BYTES:
+        rows = await asyncio.to_thread(_decode_rows, payloads)
+    else:
+        rows = _decode_rows(payloads)
+    stats["hits"] += len(rows)
+
+    table, pk_name = model.__tablename__, ENTITIES[model]
+    candidates = [pk for pk in ids if pk not in rows]
+    absent = await existence_index.absent_values(table, pk_name, candidates, lookup=True) if candidates else None
+    missing = [pk for pk in candidates if absent is None or pk not in absent]
+    if missing:
+        stats["misses"] += len(missing)
+        pk_column = getattr(model, pk_name)
+        result = await dbsession.execute(select(model).where(pk_column.in_(missing)))
+        items = result.scalars().all()
+        await store_rows(items)
+        rows.update((getattr(item, pk_name), item.model_dump()) for item in items)
+        # Sem filtro utilizável não houve resposta do filtro a avaliar
+        if absent is not None:
+            for pk in missing:
+                if pk not in rows:
+                    existence_index.record_false_positive(table, pk_name)
+
+    # Instâncias avulsas, sem sessão: a resposta só lê as colunas
+    return [model(**rows[pk]) for pk in ids if pk in rows]
+
+
+async def lookup_page(dbsession: AsyncSession, model, ids: list[int], current_page: int = 1,
+                      records_per_page: int = 10) -> PaginatedResponseTemplate:
+    """Equivalente a get_paginated_data para consultas só por chave primária, sem COUNT/OFFSET."""
+    items = await get_rows(dbsession, model, ids)
+    offset = (current_page - 1) * records_per_page
+    page = items[offset:offset + records_per_page]
+    return PaginatedResponseTemplate(
+        data=page,
+        total_pages=ceil(len(items) / records_per_page),
+        total_items=len(items),
+        page_number=current_page,
+        page_size=len(page)
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from datetime import date, datetime
 
 
@@ -115,8 +115,13 @@ class ProgramaResponse(BaseModel):
     acao_orcamentaria: Optional[str]
     nome_subtipo_programa: Optional[str]
     descricao_subtipo_programa: Optional[str]
-    proponentes: Optional[List[ProponenteSimpleResponse]] = []
-    propostas: Optional[List[PropostaSimpleResponse]] = []
+    qtd_proponentes: Optional[int] = None
+    qtd_propostas: Optional[int] = None
+    proponentes: Optional[List[Union[ProponenteSimpleResponse, ProponenteResponse]]] = None
+    propostas: Optional[List[Union[PropostaSimpleResponse, PropostaResponse]]] = None
+    # Presentes só quando a lista é incluída: True se ela foi cortada em limite_relacionados
+    proponentes_truncados: Optional[bool] = None
+    propostas_truncadas: Optional[bool] = None
 
 
 class PaginatedProgramaResponse(PaginatedResponseTemplate):
@@ -391,6 +396,22 @@ class PaginatedEtapaCronoFisicoResponse(PaginatedResponseTemplate):
     data: List[EtapaCronoFisicoResponse] 
 
 
+class MetaCronogramaFisicoResponse(MetaCronoFisicoResponse):
+    qtd_etapas: int
+    vl_total_etapas: float
+    etapas: List[EtapaCronoFisicoResponse] = []
+
+
+class CronogramaFisicoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True, extra="forbid")
+
+    nr_convenio: int
+    qtd_metas: int
+    vl_total_metas: float
+    vl_total_etapas: float
+    metas: List[MetaCronogramaFisicoResponse]
+
+
 class HistoricoSituacaoResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True, extra="forbid")
 
@@ -482,7 +503,9 @@ class EmpenhoResponse(BaseModel):
     plano_interno: Optional[str]
     ptres: Optional[str]
     valor_empenho: Optional[float]
-    desembolsos: Optional[List[EmpenhoDesembolsoResponse]] = []
+    qtd_desembolsos: Optional[int] = None
+    valor_total_desembolsos: Optional[float] = None
+    desembolsos: Optional[List[EmpenhoDesembolsoResponse]] = None
 
 
 class PaginatedEmpenhoResponse(PaginatedResponseTemplate):
@@ -701,6 +724,21 @@ class PaginatedCoordenadasObraResponse(PaginatedResponseTemplate):
     data: List[CoordenadasObraResponse]
 
 
+class ClusterCoordenadasObraResponse(BaseModel):
+    latitude: float
+    longitude: float
+    quantidade: int
+
+
+class TileCoordenadasObraResponse(BaseModel):
+    z: int
+    x: int
+    y: int
+    total_items: int
+    clusters: List[ClusterCoordenadasObraResponse] = []
+    pontos: List[CoordenadasObraResponse] = []
+
+
 class AcompObrasContratosMedicoesModuloEmpresasResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True, extra="forbid")
 
@@ -0,0 +1,88 @@
+# src/snapshot.py
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+import orjson
+from cashews import cache
+from appconfig import Settings
+from src.cache import hot_keys, cache_budget
+from src.dataset import dataset
+
+config = Settings()
+logger = logging.getLogger(__name__)
+
+# Layout do arquivo: <tamanho do cabeçalho><cabeçalho JSON> e, para cada entrada,
+# <tamanho da chave><tamanho do payload><expira em> <chave> <payload já comprimido>
+_LENGTH = struct.Struct("<I")
+_RECORD = struct.Struct("<IId")
+
+
+async def save_snapshot(path: str):
+    """Grava as entradas mais acessadas deste worker, como estão no Redis, em um arquivo local."""
+    keys = [key for key, _ in hot_keys.most_common(config.CACHE_SNAPSHOT_KEYS)
+            if f":{dataset.version}:" in key]
+    if not keys:
+        return
+    start = time.perf_counter()
+    payloads = await cache.get_many(*keys)
+    expires = await asyncio.gather(*(cache.get_expire(key) for key in keys))
+    now = time.time()
+
+    body = bytearray()
+    count = 0
+    for key, payload, expire in zip(keys, payloads, expires):
+        if not isinstance(payload, bytes) or expire <= 0:
+            continue
+        encoded_key = key.encode()
+        body += _RECORD.pack(len(encoded_key), len(payload), now + expire)
+        body += encoded_key + payload
+        count += 1
+    header = orjson.dumps({"version": dataset.version, "created_at": now, "entries": count})
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Vários workers podem gravar ao mesmo tempo; o último snapshot completo prevalece
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_LENGTH.pack(len(header)) + header)
+        f.write(body)
+    os.replace(tmp_path, path)
+    logger.info(f"Snapshot do cache: {count} entradas ({len(body) / 1024 ** 2:.1f} MB) "
+                f"gravadas em {time.perf_counter() - start:.2f}s")
+
+
+async def restore_snapshot(path: str):
+    """Recarrega no Redis as entradas do snapshot, se ele pertence à versão atual da base.
+    Chaves que já existem no Redis não são sobrescritas."""
+    if not os.path.exists(path) or os.path.getsize(path) <= _LENGTH.size:
+        return
+    start = time.perf_counter()
+    restored = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (header_size,) = _LENGTH.unpack_from(mm, 0)
+        offset = _LENGTH.size + header_size
+        header = orjson.loads(mm[_LENGTH.size:offset])
+        if header["version"] != dataset.version:
+            logger.info(f"Snapshot do cache ignorado: versão {header['version']} difere da base atual")
+            return
+
+        now = time.time()
+        while offset < len(mm):
+            key_size, payload_size, expire_at = _RECORD.unpack_from(mm, offset)
+            offset += _RECORD.size
+            key = mm[offset:offset + key_size].decode()
+            offset += key_size
+            payload = mm[offset:offset + payload_size]
+            offset += payload_size
+            if expire_at - now < 1:
+                continue
+            if await cache.exists(key):
+                continue
+            if not await cache_budget.reserve(key, payload_size, expire_at - now):
+                break
+            await cache.set(key, payload, expire=expire_at - now)
+            restored += 1
+    logger.info(f"Snapshot do cache: {restored}/{header['entries']} entradas restauradas "
+                f"em {time.perf_counter() - start:.2f}s")
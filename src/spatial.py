@@ -0,0 +1,259 @@
+import asyncio
+import math
+import logging
+from array import array
+from sqlalchemy import text, func, literal_column, literal, and_, any_, select, BigInteger
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine
+from appconfig import Settings
+from src import models
+from src.models import db_schema
+
+logger = logging.getLogger(__name__)
+config = Settings()
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+MAX_MERCATOR_LAT = 85.05112878
+
+_POSTGIS_QUERY = text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'postgis')")
+_GIST_INDEX_DDL = text(f"""
+    CREATE INDEX IF NOT EXISTS ix_coordenadas_obra_geom
+    ON {db_schema}.coordenadas_obra
+    USING gist (ST_SetSRID(ST_MakePoint(longitude_cadastro_obra, latitude_cadastro_obra), 4326))
+""")
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, km: float) -> tuple[float, float, float, float]:
+    # Retângulo que envolve o círculo; usado como pré-filtro antes da distância exata
+    dlat = km / KM_PER_DEGREE
+    dlon = km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return (max(lat - dlat, -90.0), max(lon - dlon, -180.0),
+            min(lat + dlat, 90.0), min(lon + dlon, 180.0))
+
+
+def parse_bbox(value: str) -> tuple[float, float, float, float]:
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(v) for v in value.split(","))
+    except ValueError:
+        raise ValueError("bbox deve ter o formato min_lat,min_lon,max_lat,max_lon")
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        raise ValueError("bbox fora dos limites ou com mínimos maiores que máximos")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+class GridIndex:
+    """Índice em grade regular (em graus) sobre pontos (id, lat, lon) mantidos em memória."""
+
+    def __init__(self, cell_size: float = 0.25):
+        self.cell_size = cell_size
+        self.ids = array("q")
+        self.lats = array("d")
+        self.lons = array("d")
+        self.cells: dict[tuple[int, int], array] = {}
+        self.cell_ids: dict[tuple[int, int], array] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def build(self, rows):
+        ids, lats, lons = array("q"), array("d"), array("d")
+        buckets: dict[tuple[int, int], list[int]] = {}
+        for pos, (id_, lat, lon) in enumerate(rows):
+            ids.append(id_)
+            lats.append(lat)
+            lons.append(lon)
+            buckets.setdefault(self._cell(lat, lon), []).append(pos)
+        self.ids, self.lats, self.lons = ids, lats, lons
+        self.cells = {cell: array("I", positions) for cell, positions in buckets.items()}
+        self.cell_ids = {cell: array("q", (ids[p] for p in positions)) for cell, positions in buckets.items()}
+
+    def _cells_in(self, min_lat, min_lon, max_lat, max_lon):
+        min_i, min_j = self._cell(min_lat, min_lon)
+        max_i, max_j = self._cell(max_lat, max_lon)
+        # Em retângulos grandes é mais barato filtrar as células ocupadas do que enumerar a grade
+        if (max_i - min_i + 1) * (max_j - min_j + 1) > len(self.cells):
+            cells = [c for c in self.cells if min_i <= c[0] <= max_i and min_j <= c[1] <= max_j]
+        else:
+            cells = [(i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)
+                     if (i, j) in self.cells]
+        return cells, (min_i, min_j, max_i, max_j)
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> list[int]:
+        ids, lats, lons = self.ids, self.lats, self.lons
+        cells, (min_i, min_j, max_i, max_j) = self._cells_in(min_lat, min_lon, max_lat, max_lon)
+        found = []
+        for i, j in cells:
+            if min_i < i < max_i and min_j < j < max_j:
+                # Células internas dispensam a comparação ponto a ponto
+                found.extend(self.cell_ids[(i, j)])
+            else:
+                found.extend(ids[p] for p in self.cells[(i, j)]
+                             if min_lat <= lats[p] <= max_lat and min_lon <= lons[p] <= max_lon)
+        return found
+
+    def bbox_positions(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> list[int]:
+        lats, lons = self.lats, self.lons
+        cells, _ = self._cells_in(min_lat, min_lon, max_lat, max_lon)
+        return [p for cell in cells for p in self.cells[cell]
+                if min_lat <= lats[p] <= max_lat and min_lon <= lons[p] <= max_lon]
+
+    def radius(self, lat: float, lon: float, km: float) -> list[int]:
+        ids, lats, lons = self.ids, self.lats, self.lons
+        cells, _ = self._cells_in(*radius_bbox(lat, lon, km))
+        found = [ids[p] for cell in cells for p in self.cells[cell]
+                 if haversine_km(lat, lon, lats[p], lons[p]) <= km]
+        return found
+
+
+class CoordenadasIndex:
+    """Seleciona entre PostGIS (índice GiST) e a grade em memória para consultas espaciais."""
+
+    def __init__(self, cell_size: float = 0.25):
+        self.postgis = False
+        self.grid = GridIndex(cell_size)
+        self.tiles: dict[tuple[int, int, int], list[dict]] = {}
+
+    async def rebuild(self, engine: AsyncEngine):
+        async with engine.connect() as conn:
+            self.postgis = bool(await conn.scalar(_POSTGIS_QUERY))
+
+        if self.postgis:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(_GIST_INDEX_DDL)
+                logger.info("Consultas espaciais de coordenadas_obra usando PostGIS/GiST")
+            except Exception as e:
+                logger.warning(f"Não foi possível criar o índice GiST, usando grade em memória: {e!r}")
+                self.postgis = False
+
+        # A grade é mantida mesmo com PostGIS, pois alimenta a agregação dos tiles do mapa
+        query = select(
+            models.CoordenadasObra.id_proposta,
+            models.CoordenadasObra.latitude_cadastro_obra,
+            models.CoordenadasObra.longitude_cadastro_obra,
+        ).where(
+            models.CoordenadasObra.latitude_cadastro_obra.is_not(None),
+            models.CoordenadasObra.longitude_cadastro_obra.is_not(None),
+        )
+        async with engine.connect() as conn:
+            result = await conn.stream(query)
+            rows = [tuple(row) async for row in result]
+        # Construção e pré-cálculo são CPU-bound; rodam fora do event loop
+        grid = GridIndex(self.grid.cell_size)
+        await asyncio.to_thread(grid.build, rows)
+        tiles = await asyncio.to_thread(precompute_tiles, grid, config.TILE_PRECOMPUTE_MAX_ZOOM, config.TILE_CLUSTER_GRID)
+        self.grid, self.tiles = grid, tiles
+        logger.info(f"Índice espacial em memória de coordenadas_obra: {len(grid)} pontos, "
+                    f"{len(self.tiles)} tiles pré-calculados")
+
+    def clusters(self, z: int, x: int, y: int) -> list[dict]:
+        if z <= config.TILE_PRECOMPUTE_MAX_ZOOM:
+            return self.tiles.get((z, x, y), [])
+        grid = self.grid
+        positions = grid.bbox_positions(*tile_bbox(z, x, y))
+        return cluster_positions(grid, positions, z, config.TILE_CLUSTER_GRID).get((x, y), [])
+
+    def tile_clause(self, z: int, x: int, y: int):
+        ids = self.grid.ids
+        return _ids_clause([ids[p] for p in self.grid.bbox_positions(*tile_bbox(z, x, y))])
+
+    def bbox_clause(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+        if self.postgis:
+            return _geom().op("&&")(_envelope(min_lat, min_lon, max_lat, max_lon))
+        return _ids_clause(self.grid.bbox(min_lat, min_lon, max_lat, max_lon))
+
+    def radius_clause(self, lat: float, lon: float, km: float):
+        if self.postgis:
+            center = func.ST_SetSRID(func.ST_MakePoint(lon, lat), literal_column("4326"))
+            return and_(
+                _geom().op("&&")(_envelope(*radius_bbox(lat, lon, km))),
+                func.ST_DWithin(func.geography(_geom()), func.geography(center), km * 1000),
+            )
+        return _ids_clause(self.grid.radius(lat, lon, km))
+
+
+def _mercator(lat: float, lon: float) -> tuple[float, float]:
+    # Coordenadas normalizadas (0..1) da projeção Web Mercator usada pelos tiles XYZ
+    lat = min(max(lat, -MAX_MERCATOR_LAT), MAX_MERCATOR_LAT)
+    sin_lat = math.sin(math.radians(lat))
+    mx = (lon + 180.0) / 360.0
+    my = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(mx, 0.0), 1 - 1e-12), min(max(my, 0.0), 1 - 1e-12)
+
+
+def tile_bbox(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    n = 2 ** z
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _bin_points(points, z: int, cells_per_tile: int) -> dict[tuple[int, int], list[dict]]:
+    # points: iterável de (mx, my, lat, lon); centroides calculados em lat/lon
+    scale = (2 ** z) * cells_per_tile
+    acc: dict[tuple[int, int], list] = {}
+    for mx, my, lat, lon in points:
+        cell = (int(mx * scale), int(my * scale))
+        entry = acc.get(cell)
+        if entry is None:
+            acc[cell] = [1, lat, lon]
+        else:
+            entry[0] += 1
+            entry[1] += lat
+            entry[2] += lon
+
+    tiles: dict[tuple[int, int], list[dict]] = {}
+    for (cx, cy), (count, sum_lat, sum_lon) in acc.items():
+        tiles.setdefault((cx // cells_per_tile, cy // cells_per_tile), []).append(
+            {"latitude": sum_lat / count, "longitude": sum_lon / count, "quantidade": count}
+        )
+    return tiles
+
+
+def cluster_positions(grid: GridIndex, positions, z: int, cells_per_tile: int) -> dict[tuple[int, int], list[dict]]:
+    """Agrupa os pontos em células de cells_per_tile x cells_per_tile por tile no zoom z."""
+    lats, lons = grid.lats, grid.lons
+    points = ((*_mercator(lats[p], lons[p]), lats[p], lons[p]) for p in positions)
+    return _bin_points(points, z, cells_per_tile)
+
+
+def precompute_tiles(grid: GridIndex, max_zoom: int, cells_per_tile: int) -> dict[tuple[int, int, int], list[dict]]:
+    points = [(*_mercator(lat, lon), lat, lon) for lat, lon in zip(grid.lats, grid.lons)]
+    tiles = {}
+    for z in range(max_zoom + 1):
+        for (x, y), clusters in _bin_points(points, z, cells_per_tile).items():
+            tiles[(z, x, y)] = clusters
+    return tiles
+
+
+def _geom():
+    # Mesma expressão do índice GiST, com o SRID literal para que o planner a reconheça
+    return func.ST_SetSRID(
+        func.ST_MakePoint(models.CoordenadasObra.longitude_cadastro_obra,
+                          models.CoordenadasObra.latitude_cadastro_obra),
+        literal_column("4326"),
+    )
+
+
+def _envelope(min_lat, min_lon, max_lat, max_lon):
+    return func.ST_MakeEnvelope(min_lon, min_lat, max_lon, max_lat, literal_column("4326"))
+
+
+def _ids_clause(ids: list[int]):
+    # Um único parâmetro array, evitando o limite de parâmetros do asyncpg em IN (...)
+    return models.CoordenadasObra.id_proposta == any_(literal(ids, ARRAY(BigInteger)))
+
+
+coordenadas_index = CoordenadasIndex(config.SPATIAL_GRID_CELL_DEG)
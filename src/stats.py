@@ -0,0 +1,296 @@
+# src/stats.py
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+import redis.asyncio as aioredis
+from appconfig import Settings
+
+config = Settings()
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "api:stats"
+
+# Histograma log-linear (estilo HDR) em microssegundos: 16 sub-buckets por potência de 2,
+# erro relativo < 6,25%. Valores acima de ~134 s caem no último bucket.
+_SUB_BITS = 4
+_SUB_COUNT = 1 << _SUB_BITS
+_MAX_US = (1 << 27) - 1
+# Janelas deslizantes: (segundos por fatia, número de fatias)
+LATENCY_WINDOWS = {"1m": (10, 6), "1h": (60, 60)}
+PERCENTILES = (50, 90, 99)
+
+
+def bucket_index(us: int) -> int:
+    us = min(max(us, 0), _MAX_US)
+    if us < _SUB_COUNT:
+        return us
+    shift = us.bit_length() - 1 - _SUB_BITS
+    return (shift + 1) * _SUB_COUNT + (us >> shift) - _SUB_COUNT
+
+
+def bucket_upper_ms(index: int) -> float:
+    """Limite superior do bucket, em milissegundos."""
+    if index < _SUB_COUNT:
+        return (index + 1) / 1000
+    group, sub = divmod(index, _SUB_COUNT)
+    return ((_SUB_COUNT + sub + 1) << (group - 1)) / 1000
+
+
+def summarize(buckets: Counter) -> dict:
+    """count, p50/p90/p99 e max de um histograma {bucket: contagem}."""
+    total = sum(buckets.values())
+    summary = {"count": total, **{f"p{p}": 0.0 for p in PERCENTILES}, "max": 0.0}
+    if total == 0:
+        return summary
+    targets = [(f"p{p}", total * p / 100) for p in PERCENTILES]
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        while targets and seen >= targets[0][1]:
+            summary[targets.pop(0)[0]] = bucket_upper_ms(index)
+    summary["max"] = bucket_upper_ms(max(buckets))
+    return summary
+
+
+class StatsRecorder:
+    """Estatísticas de requisições agregadas entre workers e réplicas.
+
+    O caminho da requisição só incrementa contadores em memória; a cada
+    STATS_FLUSH_INTERVAL segundos os incrementos pendentes são enviados ao Redis em um
+    único pipeline, que também devolve os totais da frota usados por /stats e /ws.
+    Sem Redis (ex.: CACHE_SERVER_URL=mem://) os totais são apenas deste processo.
+    """
+
+    def __init__(self):
+        # Visão exibida em /stats: totais da frota após o último flush
+        self.request_stats = defaultdict(lambda: {"count": 0, "total_time": 0, "last_minute_count": 0})
+        self.monthly_stats = defaultdict(int)
+        self.flushed_at = 0.0
+        self.timeseries = None
+        self._redis = None
+        self._pending_count = Counter()
+        self._pending_time = defaultdict(float)
+        self._pending_monthly = Counter()
+        # Latência por (endpoint, classe de status): {(série, bucket): contagem}
+        self._pending_latency = Counter()
+        self._pending_latency_sum = Counter()
+        self._latency_total = Counter()
+        self._latency_sum = Counter()
+        self._latency_slots = {window: {} for window in LATENCY_WINDOWS}
+        self._histograms = (0.0, {}, {})
+        self._minute = self._current_minute()
+
+    @staticmethod
+    def _current_minute() -> int:
+        return int(time.time() // 60)
+
+    def setup(self, url: str, timeseries=None):
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            self._redis = aioredis.from_url(url)
+        # Cópia durável dos incrementos deste worker (src/timeseries.py)
+        self.timeseries = timeseries
+
+    async def seed(self, endpoints: dict, monthly: dict):
+        """Restaura os totais persistidos no boot, sem sobrescrever os que o Redis já tem."""
+        if self._redis is None:
+            for path, (count, elapsed) in endpoints.items():
+                stats = self.request_stats[path]
+                stats["count"] += count
+                stats["total_time"] += elapsed
+            for month, value in monthly.items():
+                self.monthly_stats[month] += value
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for path, (count, elapsed) in endpoints.items():
+            pipe.hsetnx(f"{KEY_PREFIX}:count", path, count)
+            pipe.hsetnx(f"{KEY_PREFIX}:time", path, elapsed)
+        for month, value in monthly.items():
+            pipe.hsetnx(f"{KEY_PREFIX}:monthly", month, value)
+        await pipe.execute()
+
+    def record(self, path: str, elapsed: float, month: str):
+        self._pending_count[path] += 1
+        self._pending_time[path] += elapsed
+        self._pending_monthly[month] += 1
+
+    def record_latency(self, endpoint: str, status_code: int, elapsed: float):
+        """Registra a duração no histograma do endpoint (template da rota) e da classe de status."""
+        series = f"{endpoint} {status_code // 100}xx"
+        self._pending_latency[(series, bucket_index(int(elapsed * 1_000_000)))] += 1
+        self._pending_latency_sum[series] += elapsed
+
+    async def flush(self):
+        count, elapsed, monthly = self._pending_count, self._pending_time, self._pending_monthly
+        latency, latency_sum = self._pending_latency, self._pending_latency_sum
+        self._pending_count, self._pending_time, self._pending_monthly = Counter(), defaultdict(float), Counter()
+        self._pending_latency, self._pending_latency_sum = Counter(), Counter()
+        minute = self._current_minute()
+        if self.timeseries is not None:
+            self.timeseries.add(count, elapsed)
+            try:
+                await self.timeseries.flush()
+            except Exception as e:
+                logger.warning(f"Falha ao gravar a série temporal de estatísticas: {e!r}")
+
+        if self._redis is None:
+            self._apply_local(count, elapsed, monthly, minute)
+            self._apply_latency_local(latency, latency_sum)
+        else:
+            try:
+                await self._flush_redis(count, elapsed, monthly, minute, latency, latency_sum)
+            except Exception as e:
+                # Devolve os incrementos para a próxima tentativa
+                self._pending_count.update(count)
+                self._pending_monthly.update(monthly)
+                self._pending_latency.update(latency)
+                self._pending_latency_sum.update(latency_sum)
+                for path, value in elapsed.items():
+                    self._pending_time[path] += value
+                logger.warning(f"Falha ao enviar estatísticas ao Redis: {e!r}")
+                return
+        self.flushed_at = time.time()
+
+    def _apply_local(self, count, elapsed, monthly, minute):
+        if minute != self._minute:
+            self._minute = minute
+            for stats in self.request_stats.values():
+                stats["last_minute_count"] = 0
+        for path, value in count.items():
+            stats = self.request_stats[path]
+            stats["count"] += value
+            stats["total_time"] += elapsed[path]
+            stats["last_minute_count"] += value
+        for month, value in monthly.items():
+            self.monthly_stats[month] += value
+
+    def _apply_latency_local(self, latency: Counter, latency_sum: Counter):
+        now = time.time()
+        self._latency_total.update(latency)
+        self._latency_sum.update(latency_sum)
+        for window, (seconds, size) in LATENCY_WINDOWS.items():
+            slots, current = self._latency_slots[window], int(now // seconds)
+            if latency:
+                slots.setdefault(current, Counter()).update(latency)
+            # Descarta fatias fora da janela: a memória fica limitada a size fatias
+            for slot in [slot for slot in slots if slot <= current - size]:
+                del slots[slot]
+
+    async def _flush_redis(self, count, elapsed, monthly, minute, latency, latency_sum):
+        count_key, time_key = f"{KEY_PREFIX}:count", f"{KEY_PREFIX}:time"
+        minute_key, monthly_key = f"{KEY_PREFIX}:minute:{minute}", f"{KEY_PREFIX}:monthly"
+        pipe = self._redis.pipeline(transaction=False)
+        for path, value in count.items():
+            pipe.hincrby(count_key, path, value)
+            pipe.hincrbyfloat(time_key, path, elapsed[path])
+            pipe.hincrby(minute_key, path, value)
+        if count:
+            pipe.expire(minute_key, 180)
+        for month, value in monthly.items():
+            pipe.hincrby(monthly_key, month, value)
+        if latency:
+            now = time.time()
+            keys = [(f"{KEY_PREFIX}:latency:total", None)]
+            for window, (seconds, size) in LATENCY_WINDOWS.items():
+                keys.append((f"{KEY_PREFIX}:latency:{window}:{int(now // seconds)}", seconds * (size + 1)))
+            for key, expire in keys:
+                for (series, index), value in latency.items():
+                    pipe.hincrby(key, f"{series}|{index}", value)
+                if expire is not None:
+                    pipe.expire(key, expire)
+            for series, value in latency_sum.items():
+                pipe.hincrbyfloat(f"{KEY_PREFIX}:latency:sum", series, value)
+        pipe.hgetall(count_key)
+        pipe.hgetall(time_key)
+        pipe.hgetall(minute_key)
+        pipe.hgetall(monthly_key)
+        *_, counts, times, minutes, months = await pipe.execute()
+
+        fleet = {}
+        for path, value in counts.items():
+            path = path.decode()
+            fleet[path] = {
+                "count": int(value),
+                "total_time": float(times.get(path.encode(), 0)),
+                "last_minute_count": int(minutes.get(path.encode(), 0)),
+            }
+        # Atualiza no lugar: main.py e /ws mantêm referências a estes dicionários
+        self.request_stats.clear()
+        self.request_stats.update(fleet)
+        self.monthly_stats.clear()
+        self.monthly_stats.update({month.decode(): int(value) for month, value in months.items()})
+
+    async def histograms(self) -> tuple[dict, dict]:
+        """Histogramas por janela ("1m", "1h", "total") e série "<endpoint> <classe>", e a soma
+        das durações (s) de cada série desde o início. Com Redis, os histogramas de todos os
+        workers são somados; a leitura vale por 1 s."""
+        now = time.time()
+        read_at, windows, sums = self._histograms
+        if now - read_at < 1:
+            return windows, sums
+        if self._redis is None:
+            # Sem tráfego as fatias não são podadas no flush; ignora as expiradas aqui
+            slots = {
+                window: [buckets for slot, buckets in self._latency_slots[window].items()
+                         if slot > int(now // seconds) - size]
+                for window, (seconds, size) in LATENCY_WINDOWS.items()
+            }
+            slots["total"] = [self._latency_total]
+            sums = dict(self._latency_sum)
+        else:
+            slots, sums = await self._read_latency_redis(now)
+
+        windows = {}
+        for window, window_slots in slots.items():
+            series = defaultdict(Counter)
+            for slot in window_slots:
+                for (name, index), value in slot.items():
+                    series[name][index] += value
+            windows[window] = dict(sorted(series.items()))
+        self._histograms = (now, windows, sums)
+        return windows, sums
+
+    async def latency(self) -> dict:
+        """count, p50/p90/p99 e max (ms) por janela e série."""
+        windows, _ = await self.histograms()
+        return {
+            window: {name: summarize(buckets) for name, buckets in series.items()}
+            for window, series in windows.items()
+        }
+
+    async def _read_latency_redis(self, now: float) -> tuple[dict, dict]:
+        names = []
+        for window, (seconds, size) in LATENCY_WINDOWS.items():
+            current = int(now // seconds)
+            names.extend((window, f"{KEY_PREFIX}:latency:{window}:{slot}")
+                         for slot in range(current - size + 1, current + 1))
+        names.append(("total", f"{KEY_PREFIX}:latency:total"))
+        pipe = self._redis.pipeline(transaction=False)
+        for _, key in names:
+            pipe.hgetall(key)
+        pipe.hgetall(f"{KEY_PREFIX}:latency:sum")
+        *results, sums = await pipe.execute()
+        windows = defaultdict(list)
+        for (window, _), fields in zip(names, results):
+            slot = Counter()
+            for field, value in fields.items():
+                name, index = field.decode().rsplit("|", 1)
+                slot[(name, int(index))] = int(value)
+            windows[window].append(slot)
+        return windows, {name.decode(): float(value) for name, value in sums.items()}
+
+    async def run(self, interval: float):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            # Envia o que sobrou antes de encerrar
+            await self.flush()
+            if self.timeseries is not None:
+                await self.timeseries.flush(final=True)
+            if self._redis is not None:
+                await self._redis.aclose()
+
+
+stats_recorder = StatsRecorder()
@@ -0,0 +1,292 @@
+# src/timeseries.py
+import asyncio
+import datetime as dt
+import fcntl
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+import orjson
+
+# Mesmo fuso usado para os meses em track_requests; dias e meses das agregações seguem este fuso
+TZ_OFFSET = -3 * 3600
+_TZ = dt.timezone(dt.timedelta(seconds=TZ_OFFSET))
+_MINUTE_FILE = re.compile(r"minute-(\d{8})\.jsonl$")
+_HOUR_FILE = re.compile(r"hour-(\d{6})\.jsonl$")
+# Passos da consulta por resolução: minuto, hora, dia
+STEPS = (60, 3600, 86400)
+
+
+def _local(epoch: float) -> dt.datetime:
+    return dt.datetime.fromtimestamp(epoch, _TZ)
+
+
+def _floor_day(epoch: int) -> int:
+    return (epoch + TZ_OFFSET) // 86400 * 86400 - TZ_OFFSET
+
+
+def _add(target: dict, bucket: dict):
+    for path, (count, elapsed) in bucket.items():
+        values = target.setdefault(path, [0, 0.0])
+        values[0] += count
+        values[1] += elapsed
+
+
+def _merged(target: dict | None, bucket: dict) -> dict:
+    # Cópia somada: os dicionários publicados em _view nunca são alterados depois
+    merged = {path: list(values) for path, values in (target or {}).items()}
+    _add(merged, bucket)
+    return merged
+
+
+class TimeSeriesStore:
+    """Série temporal de requisições por endpoint, em arquivos JSON Lines.
+
+    Cada worker acrescenta uma linha por minuto fechado em minute-AAAAMMDD.jsonl (as
+    linhas do mesmo minuto são somadas na leitura); uma queda perde no máximo o minuto
+    corrente. Minutos mais antigos que a retenção viram agregados por hora
+    (hour-AAAAMM.jsonl) e horas antigas viram agregados por dia (day-AAAA.jsonl),
+    regravados de forma atômica. Toda a E/S roda fora do event loop.
+
+    A leitura dos arquivos monta novos dicionários e os publica de uma vez em `_view`;
+    as consultas, no event loop, só leem a visão publicada e nunca esperam pela E/S.
+    As linhas dos outros workers são lidas a cada `refresh_interval` segundos.
+    """
+
+    def __init__(self, directory: str, minute_retention_hours: int = 48, hour_retention_days: int = 90,
+                 refresh_interval: int = 60):
+        self.directory = directory
+        self.minute_retention = minute_retention_hours * 3600
+        self.hour_retention = hour_retention_days * 86400
+        self.refresh_interval = refresh_interval
+        # (minutos, horas, dias), cada um {início do intervalo: {endpoint: [contagem, tempo total]}}
+        self._view: tuple[dict, dict, dict] = ({}, {}, {})
+        self._pending: dict[int, dict] = defaultdict(dict)
+        self._offsets: dict[str, int] = {}
+        self._compacted_at = 0.0
+        self._refreshed_at = 0.0
+        # Serializa só as leituras de arquivo entre si (threads); as consultas não o usam
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def minutes(self) -> dict[int, dict]:
+        return self._view[0]
+
+    @property
+    def hours(self) -> dict[int, dict]:
+        return self._view[1]
+
+    @property
+    def days(self) -> dict[int, dict]:
+        return self._view[2]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # Escrita
+
+    def add(self, count: dict, elapsed: dict):
+        """Acumula os incrementos do flush corrente no minuto atual (só memória)."""
+        minute = int(time.time() // 60 * 60)
+        bucket = self._pending[minute]
+        for path, value in count.items():
+            values = bucket.setdefault(path, [0, 0.0])
+            values[0] += value
+            values[1] += elapsed[path]
+
+    async def flush(self, final: bool = False):
+        """Grava os minutos fechados (ou todos, no desligamento) e atualiza a visão em memória."""
+        current = int(time.time() // 60 * 60)
+        closed = {minute: bucket for minute, bucket in self._pending.items() if final or minute < current}
+        if closed:
+            for minute in closed:
+                del self._pending[minute]
+            await asyncio.to_thread(self._append, closed)
+        # Também sem minutos próprios: um worker ocioso ainda lê as linhas dos demais
+        if closed or time.time() - self._refreshed_at >= self.refresh_interval:
+            await asyncio.to_thread(self.refresh)
+        if not final and time.time() - self._compacted_at >= 3600:
+            self._compacted_at = time.time()
+            await asyncio.to_thread(self.compact)
+
+    def _append(self, buckets: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        lines = defaultdict(list)
+        for minute, bucket in sorted(buckets.items()):
+            if bucket:
+                name = f"minute-{_local(minute):%Y%m%d}.jsonl"
+                lines[name].append(orjson.dumps([minute, bucket]))
+        for name, content in lines.items():
+            # O_APPEND: linhas curtas de vários workers não se intercalam
+            fd = os.open(self._path(name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, b"\n".join(content) + b"\n")
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # Leitura
+
+    def load(self):
+        """Carrega agregados e minutos do disco, compactando antes o que passou da retenção."""
+        self.compact()
+        self._compacted_at = time.time()
+        with self._refresh_lock:
+            hours, days = {}, {}
+            if os.path.isdir(self.directory):
+                for name in sorted(os.listdir(self.directory)):
+                    if name.startswith("day-") and name.endswith(".jsonl"):
+                        days.update(self._read_rollup(self._path(name)))
+                    elif _HOUR_FILE.match(name):
+                        hours.update(self._read_rollup(self._path(name)))
+            self._offsets = {}
+            self._view = ({}, hours, days)
+        self.refresh()
+
+    def refresh(self):
+        """Lê as linhas novas dos arquivos de minuto, inclusive as gravadas por outros workers."""
+        with self._refresh_lock:
+            minutes, hours, days = (dict(source) for source in self._view)
+            offsets = dict(self._offsets)
+            names = sorted(name for name in os.listdir(self.directory) if _MINUTE_FILE.match(name)) \
+                if os.path.isdir(self.directory) else []
+            lines = defaultdict(list)
+            for name in names:
+                path = self._path(name)
+                offset = offsets.get(name, 0)
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                end = data.rfind(b"\n") + 1
+                for line in data[:end].splitlines():
+                    try:
+                        minute, bucket = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # Linha truncada por queda durante a escrita
+                        continue
+                    lines[minute].append(bucket)
+                offsets[name] = offset + end
+            for minute, buckets in lines.items():
+                merged = _merged(minutes.get(minute), buckets[0])
+                for bucket in buckets[1:]:
+                    _add(merged, bucket)
+                minutes[minute] = merged
+            for name in set(offsets) - set(names):
+                del offsets[name]
+            self._roll_memory(minutes, hours, days)
+            self._offsets = offsets
+            self._view = (minutes, hours, days)
+            self._refreshed_at = time.time()
+
+    def _roll_memory(self, minutes: dict, hours: dict, days: dict):
+        # Mantém a memória limitada: minutos antigos viram horas, horas antigas viram dias
+        now = time.time()
+        for minute in [minute for minute in minutes if minute < now - self.minute_retention]:
+            hour = minute // 3600 * 3600
+            hours[hour] = _merged(hours.get(hour), minutes.pop(minute))
+        for hour in [hour for hour in hours if hour < now - self.hour_retention]:
+            day = _floor_day(hour)
+            days[day] = _merged(days.get(day), hours.pop(hour))
+
+    @staticmethod
+    def _read_rollup(path: str) -> dict:
+        rollup = {}
+        with open(path, "rb") as f:
+            for line in f:
+                start, bucket = orjson.loads(line)
+                rollup[start] = bucket
+        return rollup
+
+    # Compactação
+
+    def compact(self):
+        """Agrega arquivos de minuto antigos em horas e arquivos de hora antigos em dias.
+        Só um worker compacta por vez; os demais pulam a rodada."""
+        if not os.path.isdir(self.directory):
+            return
+        with open(self._path(".compact.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            try:
+                self._compact_minutes()
+                self._compact_hours()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _compact_minutes(self):
+        cutoff = _local(time.time() - self.minute_retention).strftime("%Y%m%d")
+        for name in sorted(os.listdir(self.directory)):
+            match = _MINUTE_FILE.match(name)
+            # Só dias inteiros fora da retenção
+            if not match or match[1] >= cutoff:
+                continue
+            hours = defaultdict(dict)
+            with open(self._path(name), "rb") as f:
+                for line in f:
+                    try:
+                        minute, bucket = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+                    _add(hours[minute // 3600 * 3600], bucket)
+            # Substitui as horas do dia (idempotente se a remoção abaixo não chegar a acontecer)
+            self._merge_rollup(f"hour-{match[1][:6]}.jsonl", hours)
+            os.remove(self._path(name))
+
+    def _compact_hours(self):
+        cutoff = _local(time.time() - self.hour_retention).strftime("%Y%m")
+        for name in sorted(os.listdir(self.directory)):
+            match = _HOUR_FILE.match(name)
+            if not match or match[1] >= cutoff:
+                continue
+            days = defaultdict(dict)
+            for hour, bucket in self._read_rollup(self._path(name)).items():
+                _add(days[_floor_day(hour)], bucket)
+            self._merge_rollup(f"day-{match[1][:4]}.jsonl", days)
+            os.remove(self._path(name))
+
+    def _merge_rollup(self, name: str, buckets: dict):
+        path = self._path(name)
+        rollup = self._read_rollup(path) if os.path.exists(path) else {}
+        rollup.update(buckets)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(orjson.dumps([start, bucket]) + b"\n" for start, bucket in sorted(rollup.items())))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # Consultas
+
+    def series(self, start: float, end: float, endpoint: str | None = None, max_points: int = 500) -> dict:
+        """Requisições e tempo médio entre start e end, no menor passo que cabe em max_points."""
+        step = next((step for step in STEPS if (end - start) / step <= max_points), STEPS[-1])
+        points = defaultdict(lambda: [0, 0.0])
+        for source in self._view:
+            for bucket_start, bucket in source.items():
+                if not start <= bucket_start < end:
+                    continue
+                key = _floor_day(bucket_start) if step == 86400 else bucket_start // step * step
+                values = points[key]
+                for path, (count, elapsed) in bucket.items():
+                    if endpoint is None or path == endpoint:
+                        values[0] += count
+                        values[1] += elapsed
+        return {
+            "step": step,
+            "points": [
+                {"t": t, "count": count, "avg_time": elapsed / count * 1000 if count else 0}
+                for t, (count, elapsed) in sorted(points.items())
+            ],
+        }
+
+    def totals(self) -> tuple[dict, dict]:
+        """Totais por endpoint ({endpoint: [contagem, tempo]}) e por mês ("MM/AAAA")."""
+        endpoints, monthly = {}, defaultdict(int)
+        for source in self._view:
+            for bucket_start, bucket in source.items():
+                _add(endpoints, bucket)
+                monthly[_local(bucket_start).strftime("%m/%Y")] += sum(count for count, _ in bucket.values())
+        return endpoints, dict(monthly)
@@ -2,11 +2,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator
 from sqlmodel import select, func
 from math import ceil
-import asyncio
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi import Depends, HTTPException, status
 import secrets
+from base64 import b64decode
 from appconfig import Settings
+from src.rowcache import store_rows
+from src.bloom import existence_index
+from src.dbstats import db_phase
 
 security_stats = HTTPBasic()
 config = Settings()
@@ -25,20 +28,30 @@ async def get_paginated_data(query: select, dbsession: AsyncSession, response_sc
     # Calculate the offset based on the current page and records per page
     offset = (current_page - 1) * records_per_page
 
+    # Filtro por id certamente inexistente: página vazia sem ir ao banco
+    if await existence_index.excludes(query):
+        return response_schema(data=[], total_pages=0, total_items=0, page_number=current_page, page_size=0)
+
     # Query total number of records
     count_query = select(func.count()).select_from(query.subquery())
-    total_records = await dbsession.scalar(count_query)
+    with db_phase("count"):
+        total_records = await dbsession.scalar(count_query)
 
     # Calculate the last page number
     last_page = ceil(total_records / records_per_page)
 
     # Query items using the calculated offset and records per page
     items_query = query.offset(offset).limit(records_per_page)
-    result = await dbsession.execute(items_query)            
-    items = result.scalars().all()    
+    with db_phase("page"):
+        result = await dbsession.execute(items_query)            
+        items = result.scalars().all()    
+
+    with db_phase("refresh"):
+        for item in items:
+            await dbsession.refresh(item)
 
-    for item in items:
-        await dbsession.refresh(item)
+    # Páginas de proposta/convênio/proponente também alimentam o cache de linhas
+    await store_rows(items)
           
     return response_schema(
             data=items,
@@ -49,25 +62,26 @@ async def get_paginated_data(query: select, dbsession: AsyncSession, response_sc
         )
 
 
-async def reset_minute_counters(request_stats:dict):
-    while True:
-        await asyncio.sleep(60)
-        for stats in request_stats.values():
-            stats["last_minute_count"] = 0
+def _is_admin(username: str, password: str) -> bool:
+    correct_username = secrets.compare_digest(username.encode(), config.STATS_USER.encode())
+    correct_password = secrets.compare_digest(password.encode(), config.STATS_PASSWORD.encode())
+    return correct_username and correct_password
 
 
-async def save_stats(request_stats:dict):
-    import pickle
-    while True:
-        await asyncio.sleep(7200)
-        with open('monthly_request_stats.pkl', 'wb') as f:
-            pickle.dump(request_stats, f, pickle.HIGHEST_PROTOCOL)
+def is_admin_authorization(authorization: str | None) -> bool:
+    """Valida um cabeçalho Authorization: Basic fora das dependências do FastAPI (ex.: middlewares)."""
+    scheme, _, encoded = (authorization or "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = b64decode(encoded).decode("utf8").partition(":")
+    except (ValueError, UnicodeDecodeError):
+        return False
+    return _is_admin(username, password)
 
 
 def verify_admin(credentials: HTTPBasicCredentials = Depends(security_stats)):
-    correct_username = secrets.compare_digest(credentials.username, config.STATS_USER)
-    correct_password = secrets.compare_digest(credentials.password, config.STATS_PASSWORD)
-    if not (correct_username and correct_password):
+    if not _is_admin(credentials.username, credentials.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -0,0 +1,145 @@
+# src/warmup.py
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict
+import httpx
+import orjson
+from fastapi import FastAPI
+from appconfig import Settings
+from src.cache import WARMUP_SCOPE_KEY, cached_routes
+
+config = Settings()
+logger = logging.getLogger(__name__)
+# Evita uma linha de log por consulta reexecutada
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Registro JSON do api.access: {"method": "GET", "path": "/proposta", "query": "uf_proponente=SP", "status": 200, ...}
+# Logs antigos do uvicorn.access: 127.0.0.1:52314 - "GET /proposta?uf_proponente=SP HTTP/1.1" 200
+_ACCESS_LINE = re.compile(r'"GET (?P<target>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+
+# Resultado da última execução, exibido em /stats
+warmup_stats = {
+    "status": "pendente",
+    "started_at": None,
+    "duration": 0.0,
+    "replayed": 0,
+    "already_cached": 0,
+    "errors": 0,
+    "coverage": 0.0,
+}
+
+
+def _mark_warmup(app):
+    """Aplicação ASGI que marca o scope das consultas do warm-up antes de repassá-las."""
+    async def marked(scope, receive, send):
+        scope[WARMUP_SCOPE_KEY] = True
+        await app(scope, receive, send)
+    return marked
+
+
+def _parse_access(line: str) -> str | None:
+    """Alvo (caminho + query) de uma requisição GET bem-sucedida, ou None."""
+    if line.startswith("{"):
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return None
+        if record.get("method") != "GET" or record.get("status") != 200:
+            return None
+        query = record.get("query")
+        return f"{record['path']}?{query}" if query else record.get("path")
+    match = _ACCESS_LINE.search(line)
+    if not match or match["status"] != "200":
+        return None
+    return match["target"]
+
+
+def _read_tail(path: str, max_bytes: int) -> list[str]:
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - max_bytes, 0))
+        lines = f.read().decode("utf8", errors="ignore").splitlines()
+    # A primeira linha pode ter sido cortada no meio
+    return lines[1:] if size > max_bytes else lines
+
+
+def top_queries(app: FastAPI, log_file: str, top_n: int, max_bytes: int) -> tuple[list[tuple[str, int]], int]:
+    """Minera o log de acesso e devolve as consultas mais frequentes por endpoint em cache,
+    junto com o total de requisições bem-sucedidas a esses endpoints."""
+    routes = cached_routes(app)
+    per_route: dict[str, Counter] = defaultdict(Counter)
+    total = 0
+    for line in _read_tail(log_file, max_bytes):
+        target = _parse_access(line)
+        if target is None:
+            continue
+        path = target.split("?", 1)[0]
+        route = next((r for r in routes if r.path_regex.match(path)), None)
+        if route is None:
+            continue
+        per_route[route.path][target] += 1
+        total += 1
+
+    selected = []
+    for counter in per_route.values():
+        selected.extend(counter.most_common(top_n))
+    return selected, total
+
+
+async def warm_up(app: FastAPI):
+    """Reexecuta internamente as consultas mais frequentes do log de acesso para aquecer o cache."""
+    if not config.WARMUP_ENABLED:
+        return
+    if not os.path.exists(config.WARMUP_LOG_FILE):
+        logger.info(f"Warm-up ignorado: {config.WARMUP_LOG_FILE} não encontrado")
+        return
+
+    start = time.perf_counter()
+    warmup_stats.update(status="executando", started_at=time.strftime("%d/%m/%Y %H:%M"),
+                        replayed=0, already_cached=0, errors=0, coverage=0.0)
+    queries, total = await asyncio.to_thread(
+        top_queries, app, config.WARMUP_LOG_FILE, config.WARMUP_TOP_N, config.WARMUP_LOG_BYTES
+    )
+    semaphore = asyncio.Semaphore(config.WARMUP_CONCURRENCY)
+    covered = 0
+
+    async def replay(client: httpx.AsyncClient, target: str, count: int):
+        nonlocal covered
+        async with semaphore:
+            try:
+                response = await client.get(target)
+            except Exception as e:
+                warmup_stats["errors"] += 1
+                logger.debug(f"Warm-up falhou em {target}: {e!r}")
+                return
+        if response.status_code != 200:
+            warmup_stats["errors"] += 1
+            return
+        warmup_stats["replayed"] += 1
+        if response.headers.get("X-Cache") in ("HIT", "STALE"):
+            warmup_stats["already_cached"] += 1
+        covered += count
+
+    transport = httpx.ASGITransport(app=_mark_warmup(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(replay(client, target, count) for target, count in queries)),
+                timeout=config.WARMUP_TIMEOUT
+            )
+            warmup_stats["status"] = "concluído"
+        except asyncio.TimeoutError:
+            warmup_stats["status"] = "interrompido (timeout)"
+
+    # Fração do tráfego registrado que passa a ser atendida pelo cache
+    warmup_stats["coverage"] = covered / total * 100 if total > 0 else 0.0
+    warmup_stats["duration"] = time.perf_counter() - start
+    logger.info(
+        f"Warm-up {warmup_stats['status']} em {warmup_stats['duration']:.1f}s: "
+        f"{warmup_stats['replayed']}/{len(queries)} consultas, {warmup_stats['errors']} erro(s), "
+        f"taxa de acerto esperada {warmup_stats['coverage']:.1f}%"
+    )
@@ -0,0 +1,32 @@
+import random
+from src.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    values = list(range(1, 20_001)) + [f"convenio-{i}" for i in range(1000)]
+    bloom = BloomFilter(len(values), 0.01)
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+    assert bloom.n == len(values)
+
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter(10_000, 0.01)
+    for value in range(10_000):
+        bloom.add(value)
+    probes = random.Random(7).sample(range(10_000, 10_000_000), 20_000)
+    observed = sum(value in bloom for value in probes) / len(probes)
+    assert observed < 0.02
+    assert abs(bloom.expected_fpr - 0.01) < 0.005
+
+
+def test_serialization_round_trip():
+    bloom = BloomFilter(500, 0.01)
+    for value in range(0, 1000, 2):
+        bloom.add(value)
+    restored = BloomFilter.from_bytes(bloom.to_bytes())
+    assert (restored.m, restored.k, restored.n) == (bloom.m, bloom.k, bloom.n)
+    assert restored.bits == bloom.bits
+    assert all(value in restored for value in range(0, 1000, 2))
+    assert [value in restored for value in range(1, 1000, 2)] == [value in bloom for value in range(1, 1000, 2)]
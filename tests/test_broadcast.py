@@ -0,0 +1,52 @@
+import copy
+from src.broadcast import merge_patch
+
+
+def apply_merge_patch(target, patch):
+    """Aplicação do JSON Merge Patch (RFC 7386), como faz o JavaScript do /stats."""
+    if not isinstance(patch, dict):
+        return patch
+    result = copy.deepcopy(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+OLD = {
+    "endpoints": {"/proposta": {"count": 10, "avg_time": 1.5}, "/convenio": {"count": 3, "avg_time": 2.0}},
+    "system": {"cpu": 10.0, "memory": 50.0},
+    "monthly": {"01/2025": 13},
+    "latency": {},
+}
+NEW = {
+    "endpoints": {"/proposta": {"count": 11, "avg_time": 1.5}, "/programa": {"count": 1, "avg_time": 9.0}},
+    "system": {"cpu": 12.5, "memory": 50.0},
+    "monthly": {"01/2025": 13, "02/2025": 1},
+    "latency": {"1m": {"/proposta 2xx": {"count": 1}}},
+}
+
+
+def test_patch_contains_only_changes():
+    patch = merge_patch(OLD, NEW)
+    assert patch["endpoints"]["/proposta"] == {"count": 11}
+    assert patch["endpoints"]["/convenio"] is None
+    assert patch["system"] == {"cpu": 12.5}
+    assert patch["monthly"] == {"02/2025": 1}
+
+
+def test_identical_snapshots_give_empty_patch():
+    assert merge_patch(NEW, copy.deepcopy(NEW)) == {}
+
+
+def test_applying_patch_reproduces_new_snapshot():
+    assert apply_merge_patch(OLD, merge_patch(OLD, NEW)) == NEW
+    assert apply_merge_patch(NEW, merge_patch(NEW, OLD)) == OLD
+
+
+def test_value_replacing_a_dict_and_back():
+    old, new = {"a": {"b": 1}}, {"a": 5}
+    assert apply_merge_patch(old, merge_patch(old, new)) == new
+    assert apply_merge_patch(new, merge_patch(new, old)) == old
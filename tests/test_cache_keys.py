@@ -0,0 +1,55 @@
+import inspect
+from typing import Optional
+from fastapi import Depends, Query
+from src.cache import build_cache_key, normalize_arguments
+
+
+def get_session():
+    yield None
+
+
+async def consulta_proposta(id_proposta: Optional[int] = Query(None), uf_proponente: Optional[str] = Query(None),
+                            pagina: int = Query(1), tamanho_da_pagina: int = Query(10),
+                            dbsession=Depends(get_session)):
+    pass
+
+
+SIGNATURE = inspect.signature(consulta_proposta)
+
+
+def key(**arguments) -> str:
+    return build_cache_key(consulta_proposta, SIGNATURE, normalize_arguments(arguments))
+
+
+def test_key_ignores_argument_order():
+    assert key(uf_proponente="SP", id_proposta=1) == key(id_proposta=1, uf_proponente="SP")
+
+
+def test_key_ignores_defaults_and_missing_parameters():
+    assert key(uf_proponente="SP") == key(uf_proponente="SP", id_proposta=None, pagina=1, tamanho_da_pagina=10)
+
+
+def test_key_ignores_injected_dependencies():
+    assert key(uf_proponente="SP", dbsession=object()) == key(uf_proponente="SP", dbsession=object())
+
+
+def test_key_strips_string_values():
+    assert key(uf_proponente="  SP ") == key(uf_proponente="SP")
+
+
+def test_key_distinguishes_values_and_pages():
+    keys = {key(uf_proponente="SP"), key(uf_proponente="RJ"), key(uf_proponente="SP", pagina=2), key()}
+    assert len(keys) == 4
+
+
+def test_normalize_arguments_only_strips_strings():
+    session = object()
+    assert normalize_arguments({"uf_proponente": " SP ", "pagina": 1, "dbsession": session}) == {
+        "uf_proponente": "SP", "pagina": 1, "dbsession": session
+    }
+
+
+def test_key_layout():
+    prefix, endpoint, version, digest = key(uf_proponente="SP").split(":")
+    assert (prefix, endpoint) == ("api", "consulta_proposta")
+    assert len(digest) == 32
@@ -0,0 +1,45 @@
+from collections import Counter
+import pytest
+from src.stats import _MAX_US, _SUB_COUNT, bucket_index, bucket_upper_ms, summarize
+
+
+def test_small_values_have_exact_buckets():
+    for us in range(_SUB_COUNT):
+        assert bucket_index(us) == us
+        assert bucket_upper_ms(us) == (us + 1) / 1000
+
+
+@pytest.mark.parametrize("us", [16, 17, 31, 32, 33, 1000, 4095, 4096, 123_456, 5_000_000, _MAX_US])
+def test_upper_bound_covers_value_with_bounded_error(us):
+    upper = bucket_upper_ms(bucket_index(us)) * 1000
+    assert us < upper
+    assert (upper - us) / us <= 1 / _SUB_COUNT
+
+
+def test_buckets_are_contiguous_and_monotonic():
+    previous_index, previous_upper = -1, 0.0
+    for us in range(0, 70_000):
+        index = bucket_index(us)
+        assert index in (previous_index, previous_index + 1)
+        if index != previous_index:
+            # O novo bucket começa exatamente onde o anterior termina
+            assert us == round(previous_upper * 1000)
+            previous_index, previous_upper = index, bucket_upper_ms(index)
+
+
+def test_values_are_clamped():
+    assert bucket_index(-5) == 0
+    assert bucket_index(_MAX_US * 10) == bucket_index(_MAX_US)
+
+
+def test_summarize_percentiles():
+    buckets = Counter({bucket_index(1000): 90, bucket_index(50_000): 9, bucket_index(2_000_000): 1})
+    summary = summarize(buckets)
+    assert summary["count"] == 100
+    assert summary["p50"] == summary["p90"] == bucket_upper_ms(bucket_index(1000))
+    assert summary["p99"] == bucket_upper_ms(bucket_index(50_000))
+    assert summary["max"] == bucket_upper_ms(bucket_index(2_000_000))
+
+
+def test_summarize_empty():
+    assert summarize(Counter()) == {"count": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}